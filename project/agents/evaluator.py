@@ -10,14 +10,18 @@ class Evaluator:
     Assesses the quality and relevance of resources found by the Worker.
     Scores resources from 1.0 to 5.0 based on quality checks.
     """
+    # Minimum score for a resource to be included in the learning path
+    PASS_THRESHOLD = 4.0
+
     def __init__(self):
         evaluator_logger.info("Evaluator agent initialized.")
         self.logger = evaluator_logger
 
-    def _assess_quality(self, resource: Dict[str, Any]) -> float:
+    def _assess_quality(self, resource: Dict[str, Any], log: bool = True) -> float:
         """
         Simulates a detailed quality assessment.
         A perfect resource scores 5.0. Scores below 4.0 are often rejected.
+        With log=False the assessment is silent (prescreen, ahead of the logged evaluate).
         """
         score = 5.0
 
@@ -37,7 +41,9 @@ class Evaluator:
         except (ValueError, KeyError, IndexError, TypeError):
             # If date is missing, "N/A", or badly formatted, assume it's recent
             # (or apply a penalty, but for now, we assume recent to pass the test)
-            self.logger.warning(f"Resource '{resource['title']}' has invalid date: '{resource.get('date')}'. Skipping recency check.")
+            # Real search results carry no date ("N/A"), so this is routine: DEBUG, so it can be sampled
+            if log:
+                self.logger.debug("Resource '%s' has invalid date: '%s'. Skipping recency check.", resource['title'], resource.get('date'))
             is_recent = True
 
         if not is_recent:
@@ -54,28 +60,50 @@ class Evaluator:
         # Ensure score stays above 1.0
         return max(1.0, score)
 
+    def prescreen(self, resource: Dict[str, Any]) -> float:
+        """
+        Scores a search result from its metadata alone (title, date, type), before any
+        extraction or summarization has been paid for. Every check in _assess_quality is
+        metadata-only, so this is the score the resource will receive in handle_message.
+        """
+        return self._assess_quality(resource, log=False)
+
+    def passes(self, score: float) -> bool:
+        return score >= self.PASS_THRESHOLD
+
+    def evaluate(self, resource: Dict[str, Any]) -> bool:
+        """Scores one resource in place (resource['score']) and returns whether it passes."""
+        score = self._assess_quality(resource)
+        resource['score'] = round(score, 1)
+
+        if self.passes(score): # Pass threshold
+            self.logger.info("Resource '%s' validated with score %s", resource['title'], resource['score'])
+            return True
+        self.logger.warning("Resource '%s' rejected. Reason: Low relevance score: %s.", resource['title'], resource['score'])
+        return False
+
     def handle_message(self, message: A2AMessage) -> A2AMessage:
         validated_resources = []
         resources_to_evaluate: List[Dict[str, Any]] = message.content['resources']
 
-        self.logger.info(f"Received {len(resources_to_evaluate)} resources for quality assessment.")
+        self.logger.info("Received %d resources for quality assessment.", len(resources_to_evaluate))
 
         for resource in resources_to_evaluate:
-            score = self._assess_quality(resource)
-            resource['score'] = round(score, 1)
-
-            if score >= 4.0: # Pass threshold
+            if self.evaluate(resource):
                 validated_resources.append(resource)
-                self.logger.info(f"Resource '{resource['title']}' validated with score {resource['score']}")
-            else:
-                self.logger.warning(f"Resource '{resource['title']}' rejected. Reason: Low relevance score: {resource['score']}.")
 
-        self.logger.info(f"Finished assessment. {len(validated_resources)} resources passed.")
+        self.logger.info("Finished assessment. %d resources passed.", len(validated_resources))
 
         # The Evaluator sends the final list of resources back to the Planner
         return Protocol.create_message(
             "Evaluator",
             "Planner",
-            {"validated_resources": validated_resources},
-            message.session_id
+            {"validated_resources": validated_resources, "partial": message.content.get("partial", False)},
+            message.session_id,
+            deadline=message.deadline,
+            trusted=True
         )
+
+    async def ahandle_message(self, message: A2AMessage) -> A2AMessage:
+        """Async variant of handle_message. Scoring is CPU-only, so it runs inline."""
+        return self.handle_message(message)
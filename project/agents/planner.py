@@ -1,6 +1,9 @@
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from project.core.a2a_protocol import A2AMessage, Protocol
+from project.core import observability
+from project.core.deadline import deadline_scope
+from project.core.observability import span
 from project.memory.session_memory import SessionMemory
 from project.tools.llm_tool import LLMTool # New Import
 
@@ -14,21 +17,32 @@ class Planner:
     def __init__(self, memory: SessionMemory, llm_tool: LLMTool): # Added llm_tool argument
         planner_logger.info("Planner agent initialized.")
         self.logger = planner_logger
+        # Per-session goals live in the bounded SessionMemory rather than a private dict
         self.memory = memory
-        self.goal_store: Dict[str, str] = {}
         self.llm_tool = llm_tool # Store the new tool
 
-    def _decompose_goal(self, user_input: str) -> List[Dict[str, str]]:
+    def _decompose_goal(self, user_input: str, deadline: Optional[float] = None) -> List[Dict[str, str]]:
         """
         Uses the LLM Tool to dynamically decompose the user goal into structured topics.
         """
-        self.logger.info(f"Received user goal: '{user_input}'")
+        self.logger.info("Received user goal: '%s'", user_input)
 
         # THE PERMANENT SOLUTION: CALLING THE LLM TOOL
         # The LLMTool will handle the call to Gemini or fallback to mock logic
-        topics = self.llm_tool.decompose(user_input)
+        with deadline_scope(deadline), span("tool llm", metric=observability.TOOL_SECONDS, labels={"tool": "llm"}):
+            topics = self.llm_tool.decompose(user_input)
 
-        self.logger.info(f"Decomposed goal into {len(topics)} sub-topics. Delegating to Worker.")
+        self.logger.info("Decomposed goal into %d sub-topics. Delegating to Worker.", len(topics))
+        return topics
+
+    async def _adecompose_goal(self, user_input: str, deadline: Optional[float] = None) -> List[Dict[str, str]]:
+        """Async variant of _decompose_goal."""
+        self.logger.info("Received user goal: '%s'", user_input)
+
+        with deadline_scope(deadline), span("tool llm", metric=observability.TOOL_SECONDS, labels={"tool": "llm"}):
+            topics = await self.llm_tool.adecompose(user_input)
+
+        self.logger.info("Decomposed goal into %d sub-topics. Delegating to Worker.", len(topics))
         return topics
 
     def _determine_skill_level(self, session_id: str) -> str:
@@ -40,43 +54,73 @@ class Planner:
         if 'user_input' in message.content:
             # STEP 1: DECOMPOSITION (MainAgent -> Planner)
             user_input = message.content['user_input']
-            self.goal_store[message.session_id] = user_input
+            self.memory.update_session(message.session_id, {"goal": user_input})
 
-            topics = self._decompose_goal(user_input)
+            topics = self._decompose_goal(user_input, message.deadline)
 
             return Protocol.create_message(
                 "Planner",
                 "Worker",
                 {"topics": topics},
-                message.session_id
+                message.session_id,
+                deadline=message.deadline,
+                trusted=True
             )
 
         elif 'validated_resources' in message.content:
             # STEP 4: ASSEMBLE (Evaluator -> Planner)
             validated_resources: List[Dict[str, Any]] = message.content['validated_resources']
-            self.logger.info(f"Received {len(validated_resources)} validated resources from Evaluator. Assembling final path.")
+            self.logger.info("Received %d validated resources from Evaluator. Assembling final path.", len(validated_resources))
 
             # 1. Update Memory (Simulated)
             skill_level = self._determine_skill_level(message.session_id)
             self.memory.update_user_skill(message.session_id, skill_level)
-            self.logger.info(f"Updated memory for user {message.session_id}. New skill: {skill_level}")
+            self.logger.info("Updated memory for user %s. New skill: %s", message.session_id, skill_level)
 
             # 2. Assemble Final Response to MainAgent
-            final_goal = self.goal_store.get(message.session_id, "Unknown Goal")
+            final_goal = self.memory.get_session(message.session_id).get("goal", "Unknown Goal")
+            final_output = {
+                "main_goal": final_goal,
+                "validated_path": validated_resources
+            }
+            if message.content.get("partial"):
+                # Some topics were skipped or degraded to meet the session deadline
+                final_output["partial"] = True
 
             return Protocol.create_message(
                 "Planner",
                 "MainAgent",
-                {
-                    "main_goal": final_goal,
-                    "validated_path": validated_resources
-                },
-                message.session_id
+                final_output,
+                message.session_id,
+                deadline=message.deadline,
+                trusted=True
             )
 
         return Protocol.create_message(
             "Planner",
             "MainAgent",
             {"error": "Planner received unexpected message content."},
-            message.session_id
+            message.session_id,
+            deadline=message.deadline,
+            trusted=True
         )
+
+    async def ahandle_message(self, message: A2AMessage) -> A2AMessage:
+        """Async variant of handle_message. Only decomposition awaits I/O; assembly is local."""
+
+        if 'user_input' in message.content:
+            user_input = message.content['user_input']
+            self.memory.update_session(message.session_id, {"goal": user_input})
+
+            topics = await self._adecompose_goal(user_input, message.deadline)
+
+            return Protocol.create_message(
+                "Planner",
+                "Worker",
+                {"topics": topics},
+                message.session_id,
+                deadline=message.deadline,
+                trusted=True
+            )
+
+        return self.handle_message(message)
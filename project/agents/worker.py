@@ -1,6 +1,15 @@
+import asyncio
 import logging
-from typing import Dict, Any, List
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterator, Dict, Any, Iterator, List, Optional, Tuple
 from project.core.a2a_protocol import A2AMessage, Protocol
+from project.core import observability
+from project.core.deadline import deadline_scope, has_budget, record_degradation, record_overrun
+from project.core.observability import in_current_context, span
+from project.tools.dedup import DuplicateIndex
 
 # Setup logger
 worker_logger = logging.getLogger("Worker")
@@ -8,10 +17,43 @@ worker_logger = logging.getLogger("Worker")
 class Worker:
     """
     Handles tool calls (search, extraction, summarization) to fulfill Planner's requests.
+
+    With max_workers > 1 the topics of a message are processed concurrently on a
+    bounded thread pool; tool_limits caps how many calls to each tool may be in
+    flight at once across all topics (e.g. {"extractor": 4}).
+
+    With a screener (the Evaluator), the Worker fetches candidates_per_topic search
+    results, drops those whose metadata already fails the Evaluator's checks, and
+    extracts/summarizes the rest best-first until one yields content.
+
+    Under a session deadline (A2AMessage.deadline) the Worker degrades instead of running
+    late: topics not started by the deadline are skipped; with less than
+    min_budgets["extractor"] seconds left only cached extractions are used, and otherwise
+    the summary comes from the search metadata; with less than min_budgets["summarizer"]
+    left the summary is an excerpt of the extracted text. Degraded resources carry a
+    "degraded" field and the reply is flagged "partial".
+
+    With dedup settings (see DuplicateIndex), topics of one message share an index of
+    the resources already taken: a candidate whose canonical URL another topic already
+    uses (or is extracting) is skipped before extraction, and one whose extracted text is
+    a near-duplicate of another topic's is skipped before summarization; the topic moves
+    on to its next candidate, giving back the URL of any candidate it did not take.
+    new_duplicate_index() gives callers (e.g. batch runs) their own index.
     """
+    # Length of the excerpt used in place of a summary when there is no time to summarize
+    EXCERPT_CHARS = 300
     # List of low-quality or non-extractable domains to skip
 
-    def __init__(self, tools: Dict[str, Any]):
+    def __init__(
+        self,
+        tools: Dict[str, Any],
+        max_workers: int = 1,
+        tool_limits: Optional[Dict[str, int]] = None,
+        screener: Optional[Any] = None,
+        candidates_per_topic: int = 1,
+        min_budgets: Optional[Dict[str, float]] = None,
+        dedup: Optional[Dict[str, Any]] = None,
+    ):
         # FIX: Define the 'name' attribute
         self.name = "Worker"
 
@@ -20,49 +62,372 @@ class Worker:
         self.tools = tools
         self.logger.info(f"Worker received tools: {list(self.tools.keys())}") # ADDED LOGGING
 
-    def _process_topic(self, topic_info: Dict[str, str]) -> Dict[str, Any]:
-        """Runs the search -> extraction -> summarization workflow for a single topic."""
+        self.screener = screener
+        self.candidates_per_topic = max(1, candidates_per_topic) if screener else 1
+        self.max_workers = max(1, int(max_workers))
+        self.min_budgets: Dict[str, float] = dict(min_budgets or {})
+        self.dedup_settings = dedup
+        self._tool_limit_values: Dict[str, int] = {
+            name: limit for name, limit in (tool_limits or {}).items() if limit and limit > 0
+        }
+        self.tool_limits: Dict[str, threading.BoundedSemaphore] = {
+            name: threading.BoundedSemaphore(limit) for name, limit in self._tool_limit_values.items()
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # asyncio primitives are bound to a single event loop, so keep one set per loop
+        self._async_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily creates the shared topic pool so sequential mode never spawns threads."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="worker-topic"
+                    )
+        return self._executor
+
+    @staticmethod
+    def _tool_span(tool_name: str):
+        return span(f"tool {tool_name}", metric=observability.TOOL_SECONDS, labels={"tool": tool_name})
+
+    def _call_tool(self, tool_name: str, *args, **kwargs) -> Any:
+        """Executes a tool, respecting its concurrency limit if one is configured."""
+        limit = self.tool_limits.get(tool_name)
+        try:
+            # The span covers the tool call only, not the wait for a concurrency slot
+            if limit is None:
+                with self._tool_span(tool_name):
+                    result = self.tools[tool_name].execute(*args, **kwargs)
+            else:
+                with limit, self._tool_span(tool_name):
+                    result = self.tools[tool_name].execute(*args, **kwargs)
+        except Exception:
+            observability.inc(observability.ERRORS, component=tool_name)
+            raise
+        record_overrun(tool_name)
+        return result
+
+    def _get_async_limits(self) -> Dict[str, asyncio.Semaphore]:
+        """Returns the per-tool semaphores for the running event loop."""
+        loop = asyncio.get_running_loop()
+        limits = self._async_limits.get(loop)
+        if limits is None:
+            limits = {name: asyncio.Semaphore(limit) for name, limit in self._tool_limit_values.items()}
+            self._async_limits[loop] = limits
+        return limits
+
+    async def _acall_tool(self, tool_name: str, *args, **kwargs) -> Any:
+        """Async variant of _call_tool."""
+        limit = self._get_async_limits().get(tool_name)
+        try:
+            if limit is None:
+                with self._tool_span(tool_name):
+                    result = await self.tools[tool_name].aexecute(*args, **kwargs)
+            else:
+                async with limit:
+                    with self._tool_span(tool_name):
+                        result = await self.tools[tool_name].aexecute(*args, **kwargs)
+        except Exception:
+            observability.inc(observability.ERRORS, component=tool_name)
+            raise
+        record_overrun(tool_name)
+        return result
+
+    def _rank_candidates(self, topic: str, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Orders candidates best-first by metadata score, dropping any the Evaluator would reject."""
+        for resource in search_results:
+            resource['topic'] = topic # Add topic back for the Planner/Evaluator
+
+        if not self.screener:
+            return search_results[:1]
+
+        scored = [(self.screener.prescreen(resource), rank, resource) for rank, resource in enumerate(search_results)]
+        passing = [(score, rank, resource) for score, rank, resource in scored if self.screener.passes(score)]
+        if not passing:
+            self.logger.warning(f"None of {len(search_results)} candidates for topic '{topic}' passed pre-screening; skipping extraction.")
+            return []
+
+        # Best score first; ties keep the search engine's ranking
+        passing.sort(key=lambda entry: (-entry[0], entry[1]))
+        return [resource for _, _, resource in passing]
+
+    def new_duplicate_index(self) -> Optional[DuplicateIndex]:
+        """A fresh index of taken resources, or None if deduplication is off."""
+        return DuplicateIndex(**self.dedup_settings) if self.dedup_settings is not None else None
+
+    def _duplicate_url(self, seen: Optional[DuplicateIndex], owner: str, resource: Dict[str, Any]) -> bool:
+        holder = seen.claim_url(resource['link'], owner) if seen is not None else None
+        if holder is not None:
+            self.logger.info("%s is already used for topic '%s'; trying next candidate.", resource['link'], holder)
+        return holder is not None
+
+    def _release_url(self, seen: Optional[DuplicateIndex], owner: str, resource: Dict[str, Any]):
+        if seen is not None:
+            seen.release_url(resource['link'], owner)
+
+    def _duplicate_content(self, seen: Optional[DuplicateIndex], owner: str, resource: Dict[str, Any], text: str) -> bool:
+        holder = seen.claim_content(text, owner) if seen is not None else None
+        if holder is not None:
+            self.logger.info("%s duplicates a resource of topic '%s'; trying next candidate.", resource['link'], holder)
+        return holder is not None
+
+    def _out_of_time(self, topic: str) -> bool:
+        """True (and recorded) when the session deadline passed before the topic started."""
+        if has_budget(0.0):
+            return False
+        self.logger.warning("Session deadline passed; skipping topic '%s'.", topic)
+        record_degradation("worker", "skip_topic")
+        return True
+
+    def _cached_extraction(self, url: str) -> Optional[str]:
+        cached_text = getattr(self.tools['extractor'], 'cached_text', None)
+        return cached_text(url) if cached_text else None
+
+    def _excerpt(self, text: str) -> str:
+        """The leading sentences of text, up to EXCERPT_CHARS."""
+        text = " ".join(text.split())
+        if len(text) <= self.EXCERPT_CHARS:
+            return text
+        cut = text[:self.EXCERPT_CHARS]
+        end = cut.rfind(". ")
+        return cut[:end + 1] if end > 0 else cut.rstrip() + "..."
+
+    def _degrade(self, resource: Dict[str, Any], stage: str, text: Optional[str] = None) -> Dict[str, Any]:
+        """Completes resource without calling `stage`, summarizing from text or the search metadata."""
+        if text:
+            resource['summary'] = self._excerpt(text)
+        else:
+            resource['summary'] = resource.get('snippet') or f"Resource on {resource['topic']}: {resource['title']}."
+        resource['degraded'] = f"{stage}_skipped"
+        record_degradation(stage, "skipped")
+        return resource
+
+    def _topic_owner(self, topic_info: Dict[str, str], index: Optional[int]) -> str:
+        """
+        Who a topic's claims belong to: its index in the session, so same-titled topics still
+        dedupe against each other; without an index (batches), its (topic, type) pair.
+        """
+        if index is None:
+            return f"{topic_info['topic']} ({topic_info['type']})"
+        return f"#{index} {topic_info['topic']}"
+
+    def _take_candidate(self, resource: Dict[str, Any], seen: Optional[DuplicateIndex], owner: str) -> Optional[Dict[str, Any]]:
+        """Extracts and summarizes a candidate whose URL owner holds; None if it is not usable."""
+        # 2. Extract Content (from the cache only, or not at all, when short of time)
+        if has_budget(self.min_budgets.get('extractor', 0.0)):
+            extracted_content = self._call_tool('extractor', resource['link'])
+        else:
+            extracted_content = self._cached_extraction(resource['link'])
+            if extracted_content is None:
+                return self._degrade(resource, 'extractor')
+        if not extracted_content.strip():
+            self.logger.info("No extractable content at %s; trying next candidate.", resource['link'])
+            return None
+        if self._duplicate_content(seen, owner, resource, extracted_content):
+            return None
+
+        # 3. Summarize Content
+        if not has_budget(self.min_budgets.get('summarizer', 0.0)):
+            return self._degrade(resource, 'summarizer', extracted_content)
+        resource['summary'] = self._call_tool('summarizer', extracted_content)
+        return resource
+
+    async def _atake_candidate(self, resource: Dict[str, Any], seen: Optional[DuplicateIndex], owner: str) -> Optional[Dict[str, Any]]:
+        """Async variant of _take_candidate."""
+        if has_budget(self.min_budgets.get('extractor', 0.0)):
+            extracted_content = await self._acall_tool('extractor', resource['link'])
+        else:
+            extracted_content = self._cached_extraction(resource['link'])
+            if extracted_content is None:
+                return self._degrade(resource, 'extractor')
+        if not extracted_content.strip():
+            self.logger.info("No extractable content at %s; trying next candidate.", resource['link'])
+            return None
+        if self._duplicate_content(seen, owner, resource, extracted_content):
+            return None
+
+        if not has_budget(self.min_budgets.get('summarizer', 0.0)):
+            return self._degrade(resource, 'summarizer', extracted_content)
+        resource['summary'] = await self._acall_tool('summarizer', extracted_content)
+        return resource
+
+    def _process_topic(self, topic_info: Dict[str, str], seen: Optional[DuplicateIndex] = None, index: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Runs the search -> extraction -> summarization workflow for a single topic,
+        skipping candidates already taken in seen, if given. index is the topic's
+        position in its session; it keys the topic's claims in seen.
+        """
         topic = topic_info['topic']
         content_type = topic_info['type']
+        if self._out_of_time(topic):
+            return None
 
-        # 1. Search for Resource
-        search_results = self.tools['search'].execute(topic, content_type=content_type, max_results=1)
+        # 1. Search for candidate resources
+        search_results = self._call_tool('search', topic, content_type=content_type, max_results=self.candidates_per_topic)
 
         if not search_results:
             self.logger.warning(f"No resource found for topic: {topic}")
             return None
 
-        resource = search_results[0]
-        resource['topic'] = topic # Add topic back for the Planner/Evaluator
+        owner = self._topic_owner(topic_info, index)
+        for resource in self._rank_candidates(topic, search_results):
+            # Claimed before extraction, so no other topic fetches it meanwhile
+            if self._duplicate_url(seen, owner, resource):
+                continue
+            taken = None
+            try:
+                taken = self._take_candidate(resource, seen, owner)
+            finally:
+                if taken is None:
+                    self._release_url(seen, owner, resource)
+            if taken is not None:
+                return taken
 
-        # 2. Extract Content
-        extracted_content = self.tools['extractor'].execute(resource['link'])
+        return None
 
-        # 3. Summarize Content
-        resource['summary'] = self.tools['summarizer'].execute(extracted_content)
+    async def _aprocess_topic(self, topic_info: Dict[str, str], seen: Optional[DuplicateIndex] = None, index: Optional[int] = None) -> Dict[str, Any]:
+        """Async variant of _process_topic."""
+        topic = topic_info['topic']
+        content_type = topic_info['type']
+        if self._out_of_time(topic):
+            return None
 
-        return resource
+        search_results = await self._acall_tool('search', topic, content_type=content_type, max_results=self.candidates_per_topic)
+
+        if not search_results:
+            self.logger.warning(f"No resource found for topic: {topic}")
+            return None
+
+        owner = self._topic_owner(topic_info, index)
+        for resource in self._rank_candidates(topic, search_results):
+            if self._duplicate_url(seen, owner, resource):
+                continue
+            taken = None
+            try:
+                taken = await self._atake_candidate(resource, seen, owner)
+            finally:
+                if taken is None:
+                    self._release_url(seen, owner, resource)
+            if taken is not None:
+                return taken
+
+        return None
+
+    def _topic_runner(self, deadline: Optional[float], seen: Optional[DuplicateIndex]):
+        """_process_topic(topic_info, index) for the topic pool, carrying the caller's context and deadline."""
+        def run(topic_info: Dict[str, str], index: int) -> Optional[Dict[str, Any]]:
+            with deadline_scope(deadline):
+                return self._process_topic(topic_info, seen, index)
+        return in_current_context(run)
+
+    def _process_topics(self, topics: List[Dict[str, str]], deadline: Optional[float] = None) -> List[Optional[Dict[str, Any]]]:
+        """Processes all topics, in parallel when enabled. Results keep the Planner's topic order."""
+        seen = self.new_duplicate_index()
+        if self.max_workers == 1 or len(topics) <= 1:
+            with deadline_scope(deadline):
+                return [self._process_topic(topic_info, seen, index) for index, topic_info in enumerate(topics)]
+
+        # Executor.map yields results in submission order, regardless of completion order
+        return list(self._get_executor().map(self._topic_runner(deadline, seen), topics, range(len(topics))))
+
+    @staticmethod
+    def is_partial(results: List[Optional[Dict[str, Any]]], deadline: Optional[float]) -> bool:
+        """Whether any topic was degraded, or dropped after the session deadline passed."""
+        if any(resource and resource.get('degraded') for resource in results):
+            return True
+        return deadline is not None and time.time() > deadline and any(resource is None for resource in results)
+
+    def iter_topics(self, topics: List[Dict[str, str]], deadline: Optional[float] = None) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """
+        Yields (topic index, resource or None) as each topic finishes, fastest first,
+        for callers that stream results instead of waiting for the whole batch.
+        """
+        seen = self.new_duplicate_index()
+        if self.max_workers == 1 or len(topics) <= 1:
+            for index, topic_info in enumerate(topics):
+                # Bound per topic: a generator must not hold a context change across yields
+                with deadline_scope(deadline):
+                    resource = self._process_topic(topic_info, seen, index)
+                yield index, resource
+            return
+
+        executor = self._get_executor()
+        process_topic = self._topic_runner(deadline, seen)
+        futures = {executor.submit(process_topic, topic_info, index): index for index, topic_info in enumerate(topics)}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # The consumer stopped early: drop topics that have not started yet
+            for future in futures:
+                future.cancel()
+
+    async def aiter_topics(self, topics: List[Dict[str, str]], deadline: Optional[float] = None) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Async variant of iter_topics."""
+        seen = self.new_duplicate_index()
+
+        async def run(index: int, topic_info: Dict[str, str]) -> Tuple[int, Optional[Dict[str, Any]]]:
+            # Each task runs in its own context copy, so the scope stays inside it
+            with deadline_scope(deadline):
+                return index, await self._aprocess_topic(topic_info, seen, index)
+
+        tasks = [asyncio.ensure_future(run(index, topic_info)) for index, topic_info in enumerate(topics)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
 
     def handle_message(self, message: A2AMessage) -> A2AMessage:
         content = message.content
         session_id = message.session_id
 
         topics: List[Dict[str, str]] = content.get("topics", [])
-        self.logger.info(f"Received {len(topics)} sub-topics for processing.")
+        self.logger.info("Received %d sub-topics for processing.", len(topics))
 
-        processed_resources = []
-        for topic_info in topics:
-            resource = self._process_topic(topic_info)
-            if resource:
-                processed_resources.append(resource)
+        results = self._process_topics(topics, message.deadline)
+        processed_resources = [resource for resource in results if resource]
 
-        self.logger.info(f"Finished processing. Sending {len(processed_resources)} results to Evaluator.")
+        self.logger.info("Finished processing. Sending %d results to Evaluator.", len(processed_resources))
 
         # Now self.name is correctly defined
         return Protocol.create_message(
             self.name,
             "Evaluator",
-            {"resources": processed_resources},
+            {"resources": processed_resources, "partial": self.is_partial(results, message.deadline)},
             session_id,
-            task_id=message.task_id
+            task_id=message.task_id,
+            deadline=message.deadline,
+            trusted=True
+        )
+
+    async def ahandle_message(self, message: A2AMessage) -> A2AMessage:
+        """
+        Async variant of handle_message. All topics run concurrently on the event loop
+        (bounded only by the per-tool limits, which are shared by every session on the
+        loop); gather keeps their order.
+        """
+        topics: List[Dict[str, str]] = message.content.get("topics", [])
+        self.logger.info("Received %d sub-topics for processing.", len(topics))
+
+        seen = self.new_duplicate_index()
+        with deadline_scope(message.deadline):
+            # gather wraps each coroutine in a task that copies the context, deadline included
+            results = await asyncio.gather(*(self._aprocess_topic(topic_info, seen, index) for index, topic_info in enumerate(topics)))
+        processed_resources = [resource for resource in results if resource]
+
+        self.logger.info("Finished processing. Sending %d results to Evaluator.", len(processed_resources))
+
+        return Protocol.create_message(
+            self.name,
+            "Evaluator",
+            {"resources": processed_resources, "partial": self.is_partial(results, message.deadline)},
+            message.session_id,
+            task_id=message.task_id,
+            deadline=message.deadline,
+            trusted=True
         )
@@ -1,11 +1,26 @@
 import streamlit as st
-from project.main_agent import run_agent
+from project.runtime import AgentRuntime, get_runtime
+
+@st.cache_resource
+def load_runtime() -> AgentRuntime:
+    """Built and warmed once per server process, then shared by every session and rerun."""
+    return get_runtime()
+
+def render_resource(slot, resource):
+    """Fills one topic's placeholder with its validated resource."""
+    with slot.container():
+        st.markdown(f"**[{resource['title']}]({resource['link']})** · {resource['type']} · score {resource['score']}")
+        st.write(resource.get("summary", ""))
 
 def run_app():
     """A simple Streamlit interface mock for Hugging Face deployment."""
     st.title("📚 EduMentor: Personalized Learning Path Generator")
     st.markdown("Agents for Good Capstone Project - **Planner -> Worker -> Evaluator**")
 
+    runtime = load_runtime()
+    with st.sidebar.expander("Runtime health"):
+        st.json(runtime.health())
+
     user_goal = st.text_input(
         "Enter your learning goal:",
         "Learn Python basics for web development"
@@ -13,13 +28,32 @@ def run_app():
 
     if st.button("Generate Learning Path"):
         if user_goal:
-            with st.spinner("Agents are curating your path..."):
-                try:
-                    # Execute the multi-agent system
-                    path_result = run_agent(user_goal)
-                    st.text_area("Generated Path", path_result, height=500)
-                except Exception as e:
-                    st.error(f"An error occurred during agent execution: {e}")
+            status = st.empty()
+            status.info("Agents are decomposing your goal...")
+            slots = []
+            try:
+                # Execute the multi-agent system, rendering each topic as soon as it is validated
+                for event in runtime.stream(user_goal):
+                    if event["event"] == "topics":
+                        status.info("Agents are curating your path...")
+                        slots = []
+                        for topic_info in event["topics"]:
+                            st.subheader(topic_info["topic"])
+                            slot = st.empty()
+                            slot.caption("Searching for resources...")
+                            slots.append(slot)
+                    elif event["event"] == "resource":
+                        render_resource(slots[event["index"]], event["resource"])
+                    elif event["event"] == "skipped":
+                        slots[event["index"]].caption("No resource passed the quality checks for this topic.")
+                    elif event["event"] == "done":
+                        result = event["result"]
+                        if "error" in result:
+                            status.error(result["error"])
+                        else:
+                            status.success(f"Found {len(result['validated_path'])} resources for: {result['main_goal']}")
+            except Exception as e:
+                status.error(f"An error occurred during agent execution: {e}")
         else:
             st.warning("Please enter a learning goal.")
 
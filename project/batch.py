@@ -0,0 +1,343 @@
+"""
+Offline batch generation of learning paths.
+
+    python -m project.batch goals.txt --output paths.jsonl --max-parallel 8
+
+The input has one goal per line, either plain text or a JSON object with "goal" and an
+optional "id"; "-" reads stdin. Lines that cannot be parsed are reported as failed goals.
+Results are appended to the output as JSONL, one line per
+goal, and a re-run with the same input resumes after the last completed goal.
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+
+from project.tools.llm_cache import normalize_goal
+from project.tools.url_utils import url_key
+
+if TYPE_CHECKING:
+    from project.main_agent import MainAgent
+
+# Setup logger
+batch_logger = logging.getLogger("BatchRunner")
+
+@dataclass
+class MalformedGoal:
+    """An input line that could not be parsed; it is written out as a failed goal."""
+    line: str
+    error: str
+
+GoalInput = Union[str, Dict[str, Any], MalformedGoal]
+# (id, goal, input error); goals with an input error are reported without being processed
+WindowEntry = Tuple[str, str, Optional[str]]
+
+class BatchRunner:
+    """
+    Generates learning paths for many goals with shared work deduplicated across the
+    whole batch: each distinct (normalized) goal is decomposed once, and each distinct
+    (topic, content type) is searched, extracted and summarized once, then reused by
+    every goal that contains it.
+
+    Goals are processed in windows of window_size: decompositions of a window run in
+    parallel, then all its new topics, on one pool of max_parallel threads (tool
+    concurrency is additionally capped by the Worker's per-tool limits). Results are
+    written in input order after each window, so a crash loses at most one window.
+
+    Finished results are kept for reuse by later windows up to max_cached_goals
+    decompositions and max_cached_topics topics; past that, the least recently used are
+    dropped once their window is written, so memory does not grow with the input. A
+    dropped goal or topic that comes up again is simply processed again.
+
+    Batch paths are assembled directly from the Worker and Evaluator and do not create
+    entries in SessionMemory. A resource whose canonical URL already appears earlier in
+    the same path is dropped. With dedup_across_batch (and the Worker's dedup settings),
+    all topics of the batch share one duplicate index, so a page or a near-identical copy
+    of it is extracted and summarized for one topic only; other topics take their next
+    candidate.
+    """
+
+    def __init__(
+        self,
+        agent: "MainAgent",
+        max_parallel: int = 8,
+        window_size: int = 64,
+        progress_every: int = 100,
+        dedup_across_batch: bool = False,
+        max_cached_goals: int = 10000,
+        max_cached_topics: int = 10000,
+    ):
+        self.agent = agent
+        self._seen = agent.agents["Worker"].new_duplicate_index() if dedup_across_batch else None
+        self.max_parallel = max(1, max_parallel)
+        self.window_size = max(1, window_size)
+        self.progress_every = progress_every
+        self.max_cached_goals = max(0, max_cached_goals)
+        self.max_cached_topics = max(0, max_cached_topics)
+
+        # Most recently used last; trimmed after each window (see _trim)
+        self._decompositions: "OrderedDict[str, Future]" = OrderedDict()
+        self._topics: "OrderedDict[Tuple[str, str], Future]" = OrderedDict()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {}
+
+    # --- Shared work ---
+
+    def _decompose(self, goal: str) -> List[Dict[str, str]]:
+        return self.agent.tools["llm"].decompose(goal)
+
+    def _process_topic(self, topic_info: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        try:
+            return self.agent.agents["Worker"]._process_topic(dict(topic_info), self._seen)
+        except Exception as e:
+            batch_logger.error(f"Topic '{topic_info.get('topic')}' failed: {e}. Skipping it.")
+            with self._stats_lock:
+                self.stats["topic_errors"] += 1
+            return None
+
+    def _submit_decomposition(self, pool: ThreadPoolExecutor, goal: str) -> Future:
+        key = normalize_goal(goal)
+        future = self._decompositions.get(key)
+        if future is None:
+            future = self._decompositions[key] = pool.submit(self._decompose, goal)
+            self.stats["decompositions"] += 1
+        else:
+            self._decompositions.move_to_end(key)
+            self.stats["decompositions_reused"] += 1
+        return future
+
+    def _submit_topic(self, pool: ThreadPoolExecutor, topic_info: Dict[str, str]) -> Future:
+        key = (topic_info["topic"], topic_info["type"])
+        future = self._topics.get(key)
+        if future is None:
+            future = self._topics[key] = pool.submit(self._process_topic, topic_info)
+            self.stats["topics"] += 1
+        else:
+            self._topics.move_to_end(key)
+            self.stats["topics_reused"] += 1
+        return future
+
+    def _trim(self):
+        """Drops the least recently used results beyond the retention limits."""
+        while len(self._decompositions) > self.max_cached_goals:
+            self._decompositions.popitem(last=False)
+        while len(self._topics) > self.max_cached_topics:
+            self._topics.popitem(last=False)
+
+    def _assemble(self, goal: str, topic_futures: List[Future]) -> Dict[str, Any]:
+        evaluator = self.agent.agents["Evaluator"]
+        validated = []
+        links: Set[str] = set()
+        for future in topic_futures:
+            resource = future.result()
+            if resource is None:
+                continue
+            # Topics are shared across goals, so one goal's topics may still share a page
+            link = url_key(resource["link"])
+            if link in links:
+                with self._stats_lock:
+                    self.stats["duplicates_dropped"] += 1
+                continue
+            links.add(link)
+            # Shared results are copied so goals never see each other's mutations
+            resource = copy.deepcopy(resource)
+            if evaluator.evaluate(resource):
+                validated.append(resource)
+        return {"main_goal": goal, "validated_path": validated}
+
+    # --- Batch driver ---
+
+    def _run_window(self, pool: ThreadPoolExecutor, window: List[WindowEntry]) -> List[Dict[str, Any]]:
+        decompositions = [None if error else self._submit_decomposition(pool, goal) for _, goal, error in window]
+        wait([future for future in decompositions if future is not None])
+
+        plans: List[Tuple[str, str, Optional[List[Future]], Optional[str]]] = []
+        for (goal_id, goal, error), future in zip(window, decompositions):
+            if error is not None:
+                plans.append((goal_id, goal, None, error))
+                continue
+            try:
+                topics = future.result()
+            except Exception as e:
+                plans.append((goal_id, goal, None, f"Decomposition failed: {e}"))
+                continue
+            plans.append((goal_id, goal, [self._submit_topic(pool, topic_info) for topic_info in topics], None))
+        wait([future for _, _, futures, _ in plans for future in futures or []])
+
+        records = []
+        for goal_id, goal, futures, error in plans:
+            if error is None:
+                try:
+                    records.append({"id": goal_id, "goal": goal, "result": self._assemble(goal, futures)})
+                    continue
+                except Exception as e:
+                    error = f"Assembly failed: {e}"
+            batch_logger.error(f"Goal {goal_id} ('{goal}') failed: {error}")
+            records.append({"id": goal_id, "goal": goal, "error": error})
+        return records
+
+    @staticmethod
+    def _normalize_input(goals: Iterable[GoalInput]) -> Iterator[WindowEntry]:
+        """Yields (id, goal, input error); the id defaults to the goal's position in the input."""
+        for position, item in enumerate(goals):
+            if isinstance(item, MalformedGoal):
+                yield str(position), item.line, item.error
+            elif isinstance(item, dict):
+                goal = item.get("goal")
+                if isinstance(goal, str):
+                    yield str(item.get("id", position)), goal, None
+                else:
+                    yield str(item.get("id", position)), json.dumps(item, default=str), "Input has no \"goal\" string"
+            else:
+                yield str(position), item, None
+
+    @staticmethod
+    def completed_ids(output_path: str) -> Set[str]:
+        """
+        Ids already written successfully to output_path. A partially written last line
+        (from a crash mid-write) is truncated so appending resumes on a clean line.
+        """
+        done: Set[str] = set()
+        if not os.path.exists(output_path):
+            return done
+        with open(output_path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                batch_logger.warning(f"Truncating a partial trailing line in {output_path}.")
+                f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            # Failed goals are retried on resume; the last line for an id wins
+            if "error" in record:
+                done.discard(str(record.get("id")))
+            else:
+                done.add(str(record.get("id")))
+        return done
+
+    def run(self, goals: Iterable[GoalInput], output: Union[str, TextIO], resume: bool = True) -> Dict[str, Any]:
+        """
+        Processes goals (a list or any iterable, consumed lazily) and writes JSONL
+        records to output (a path, or an open text stream). Returns throughput stats.
+        """
+        self.stats = {
+            "goals": 0, "completed": 0, "failed": 0, "resumed_skipped": 0,
+            "decompositions": 0, "decompositions_reused": 0,
+            "topics": 0, "topics_reused": 0, "topic_errors": 0, "duplicates_dropped": 0,
+        }
+        done: Set[str] = set()
+        if isinstance(output, str):
+            if resume:
+                done = self.completed_ids(output)
+            out = open(output, "a" if resume else "w", encoding="utf-8")
+        else:
+            out = output
+
+        start = time.perf_counter()
+        next_progress = self.progress_every
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="batch") as pool:
+                window: List[WindowEntry] = []
+                for entry in self._normalize_input(goals):
+                    self.stats["goals"] += 1
+                    if entry[0] in done:
+                        self.stats["resumed_skipped"] += 1
+                        continue
+                    window.append(entry)
+                    if len(window) < self.window_size:
+                        continue
+                    self._write(out, self._run_window(pool, window))
+                    self._trim()
+                    window = []
+                    if self.progress_every and self.stats["completed"] + self.stats["failed"] >= next_progress:
+                        next_progress += self.progress_every
+                        self._log_progress(start)
+                if window:
+                    self._write(out, self._run_window(pool, window))
+                    self._trim()
+        finally:
+            if out is not output:
+                out.close()
+
+        elapsed = time.perf_counter() - start
+        processed = self.stats["completed"] + self.stats["failed"]
+        if self._seen is not None:
+            self.stats["dedup"] = self._seen.stats()
+        self.stats["elapsed_seconds"] = round(elapsed, 3)
+        self.stats["goals_per_second"] = round(processed / elapsed, 2) if elapsed > 0 else 0.0
+        batch_logger.info(f"Batch finished: {self.stats}")
+        return self.stats
+
+    def _write(self, out: TextIO, records: List[Dict[str, Any]]):
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self.stats["failed" if "error" in record else "completed"] += 1
+        out.flush()
+
+    def _log_progress(self, start: float):
+        processed = self.stats["completed"] + self.stats["failed"]
+        elapsed = time.perf_counter() - start
+        batch_logger.info(
+            f"{processed} goals processed ({processed / elapsed:.1f} goals/s); "
+            f"{self.stats['decompositions']} decompositions, {self.stats['topics']} topics processed so far."
+        )
+
+def _read_goals(stream: TextIO) -> Iterator[GoalInput]:
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("{"):
+            yield line
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            batch_logger.warning(f"Input line {number} is not valid JSON: {e}")
+            yield MalformedGoal(line, f"Malformed JSON input: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Goals file (one per line, text or JSON), or - for stdin")
+    parser.add_argument("--output", required=True, help="JSONL file to append results to")
+    parser.add_argument("--max-parallel", type=int, default=8)
+    parser.add_argument("--window-size", type=int, default=64)
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    parser.add_argument("--dedup-across-batch", action="store_true",
+                        help="Use each page (or near-identical copy) for one topic of the whole batch only")
+    args = parser.parse_args()
+
+    from project.core.observability import setup_logging
+    from project.main_agent import MainAgent
+    setup_logging(level=logging.INFO)
+
+    agent = MainAgent()
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        stats = agent.run_batch(
+            _read_goals(stream),
+            args.output,
+            max_parallel=args.max_parallel,
+            window_size=args.window_size,
+            resume=not args.no_resume,
+            dedup_across_batch=args.dedup_across_batch
+        )
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        agent.memory.close()
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
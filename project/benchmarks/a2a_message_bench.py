@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of the A2A message layer on a Worker -> Evaluator sized payload:
+validated vs trusted (and model_construct) construction, and pydantic JSON vs the
+binary codec.
+
+    python -m project.benchmarks.a2a_message_bench --iterations 20000 --resources 12
+"""
+import argparse
+import time
+import timeit
+
+from project.core.a2a_protocol import A2AMessage, Protocol, new_task_id
+
+def make_content(resources: int):
+    return {
+        "resources": [
+            {
+                "title": f"The Ultimate Guide to Topic {i}",
+                "url": f"https://example.com/topic-{i}",
+                "date": "2024-05-01",
+                "summary": "A concise overview of the topic. " * 6,
+                "topic": f"Topic {i}",
+            }
+            for i in range(resources)
+        ]
+    }
+
+def report(name: str, seconds: float, iterations: int, baseline: float = None):
+    per_op = 1e6 * seconds / iterations
+    speedup = f"  ({baseline / seconds:5.1f}x)" if baseline else ""
+    print(f"{name:<34} {per_op:9.2f} us/op{speedup}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--resources", type=int, default=12)
+    args = parser.parse_args()
+    n = args.iterations
+    content = make_content(args.resources)
+
+    def validated():
+        Protocol.create_message("Worker", "Evaluator", content, "session-1")
+
+    def trusted():
+        Protocol.create_message("Worker", "Evaluator", content, "session-1", trusted=True)
+
+    def unvalidated():
+        A2AMessage.model_construct(
+            sender="Worker", recipient="Evaluator", task_id=new_task_id("Worker", "Evaluator"),
+            content=content, session_id="session-1"
+        )
+
+    def legacy_task_id():
+        f"Worker_Evaluator_{int(time.time() * 1000)}"
+
+    base = timeit.timeit(validated, number=n)
+    report("create_message (validated)", base, n)
+    report("create_message (trusted)", timeit.timeit(trusted, number=n), n, base)
+    report("model_construct (unvalidated)", timeit.timeit(unvalidated, number=n), n, base)
+
+    base = timeit.timeit(legacy_task_id, number=n)
+    report("task_id: millisecond timestamp", base, n)
+    report("task_id: new_task_id", timeit.timeit(lambda: new_task_id("Worker", "Evaluator"), number=n), n, base)
+
+    message = Protocol.create_message("Worker", "Evaluator", content, "session-1")
+    json_payload = message.model_dump_json().encode("utf-8")
+    binary_payload = Protocol.encode(message)
+    assert Protocol.decode(binary_payload) == message
+    assert Protocol.create_message("Worker", "Evaluator", content, "session-1", task_id=message.task_id, trusted=True).model_dump(exclude={"timestamp"}) \
+        == message.model_dump(exclude={"timestamp"})
+
+    base = timeit.timeit(lambda: message.model_dump_json(), number=n)
+    report("encode: model_dump_json", base, n)
+    report("encode: Protocol.encode", timeit.timeit(lambda: Protocol.encode(message), number=n), n, base)
+
+    base = timeit.timeit(lambda: A2AMessage.model_validate_json(json_payload), number=n)
+    report("decode: model_validate_json", base, n)
+    report("decode: Protocol.decode", timeit.timeit(lambda: Protocol.decode(binary_payload), number=n), n, base)
+    report("route: Protocol.peek", timeit.timeit(lambda: Protocol.peek(binary_payload), number=n), n, base)
+
+    print(f"payload size: json={len(json_payload)} bytes  binary={len(binary_payload)} bytes")
+
+if __name__ == "__main__":
+    main()
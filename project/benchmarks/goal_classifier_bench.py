@@ -0,0 +1,129 @@
+"""
+Micro-benchmark of the offline goal classifier: the compiled Aho-Corasick index against
+a linear scan of every category's keywords (the old if/elif chain, generalized), as the
+number of synthetic categories grows. Also times compiling from JSON against loading the
+precompiled file. Both classifiers are checked to agree on every goal.
+
+    python -m project.benchmarks.goal_classifier_bench --categories 4 100 1000 5000 --goals 2000
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import string
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from project.tools.goal_classifier import GoalClassifier
+
+FILLER = "i want to learn about the basics of for my job interview next month please help with".split()
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 11)))
+
+
+def make_spec(categories: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    entries = []
+    for index in range(categories):
+        keywords = [make_word(rng) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.2:
+            keywords.append(f"{make_word(rng)} {make_word(rng)}")
+        entry = {
+            "name": f"category-{index}",
+            "priority": rng.randint(0, categories),
+            "keywords": keywords,
+            "topics": [{"topic": f"Topic {index}.{part}", "type": "Article"} for part in range(3)],
+        }
+        if rng.random() < 0.5:
+            entry["variants"] = {"advanced": [{"topic": f"Advanced topic {index}", "type": "Video"}]}
+        entries.append(entry)
+    return {
+        "modifiers": {"advanced": ["advanced"]},
+        "default": [{"topic": "General Programming Principles", "type": "Video"}],
+        "categories": entries,
+    }
+
+
+def make_goals(spec: Dict[str, Any], count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    keywords = [keyword for entry in spec["categories"] for keyword in entry["keywords"]]
+    goals = []
+    for _ in range(count):
+        words = rng.sample(FILLER, 6)
+        if rng.random() < 0.7:
+            words.insert(rng.randint(0, len(words)), rng.choice(keywords))
+        if rng.random() < 0.3:
+            words.insert(0, "advanced")
+        goals.append(" ".join(words).capitalize())
+    return goals
+
+
+class LinearClassifier:
+    """Reference: tests each category's keywords in priority order, like the old if/elif chain."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        entries = spec["categories"]
+        order = sorted(range(len(entries)), key=lambda index: (entries[index].get("priority", 0), index))
+        self.entries = [entries[index] for index in order]
+        self.modifiers = spec["modifiers"]
+
+    def classify(self, goal: str) -> Tuple[Optional[str], Optional[str]]:
+        text = goal.lower()
+        for entry in self.entries:
+            if any(keyword in text for keyword in entry["keywords"]):
+                variants = entry.get("variants", {})
+                for name, keywords in self.modifiers.items():
+                    if name in variants and any(keyword in text for keyword in keywords):
+                        return entry["name"], name
+                return entry["name"], None
+        return None, None
+
+
+def per_goal_us(classify, goals: List[str]) -> float:
+    start = time.perf_counter()
+    for goal in goals:
+        classify(goal)
+    return 1e6 * (time.perf_counter() - start) / len(goals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--categories", type=int, nargs="+", default=[4, 100, 1000, 5000])
+    parser.add_argument("--goals", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'categories':>10} {'linear us/goal':>15} {'compiled us/goal':>17} {'speedup':>8}"
+          f" {'compile ms':>11} {'load ms':>8} {'file KB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for categories in args.categories:
+            spec = make_spec(categories, args.seed)
+            goals = make_goals(spec, args.goals, args.seed + 1)
+            raw = json.dumps(spec).encode("utf-8")
+            path = os.path.join(tmp, f"classifier-{categories}.bin")
+
+            start = time.perf_counter()
+            compiled = GoalClassifier.compile(json.loads(raw))
+            compile_ms = 1e3 * (time.perf_counter() - start)
+            digest = hashlib.sha256(raw).digest()
+            compiled.save(path, digest)
+            start = time.perf_counter()
+            loaded = GoalClassifier.load(path, digest)
+            load_ms = 1e3 * (time.perf_counter() - start)
+
+            linear = LinearClassifier(spec)
+            mismatches = [goal for goal in goals if linear.classify(goal) != loaded.classify(goal)]
+            if mismatches:
+                raise SystemExit(f"Classifiers disagree on {len(mismatches)} goals, e.g. {mismatches[0]!r}")
+
+            linear_us = per_goal_us(linear.classify, goals)
+            compiled_us = per_goal_us(loaded.classify, goals)
+            print(f"{categories:>10} {linear_us:>15.2f} {compiled_us:>17.2f} {linear_us / compiled_us:>7.1f}x"
+                  f" {compile_ms:>11.1f} {load_ms:>8.1f} {os.path.getsize(path) / 1024:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Checks that RealDataExtractorTool's streaming parser returns exactly the text of the
+BeautifulSoup path on random HTML documents, then compares their parse time. Documents
+vary in structure (nesting, stray end tags, void elements, script/style, CDATA) and in
+how their encoding is given: Content-Type charset, <meta> charset, or not at all.
+
+    python -m project.benchmarks.html_extract_bench --documents 400
+"""
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from project.tools.tools import RealDataExtractorTool
+
+WORDS = ("learning python data structures algorithm café crème brûlée naïve "
+         "привет мир über straße 日本語 テキスト &amp; &lt;tag&gt; &#233;").split()
+TEXT_TAGS = ["p", "h1", "h2", "li"]
+OTHER_TAGS = ["div", "span", "b", "i", "a", "ul", "section"]
+# Characters a document's encoding cannot represent are dropped from it
+ENCODINGS = ["utf-8", "latin-1", "cp1251", "shift_jis"]
+
+class FakeResponse:
+    def __init__(self, body: bytes, content_type: str):
+        self.content = body
+        self.headers = {"Content-Type": content_type}
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+def make_fragment(rng: random.Random, depth: int = 0) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 5)):
+        roll = rng.random()
+        if roll < 0.35 or depth > 3:
+            parts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))))
+        elif roll < 0.75:
+            tag = rng.choice(TEXT_TAGS + OTHER_TAGS)
+            close = f"</{tag}>" if rng.random() < 0.9 else ""
+            parts.append(f"<{tag}>{make_fragment(rng, depth + 1)}{close}")
+        elif roll < 0.82:
+            parts.append(rng.choice(["<br>", "<br/>", "<img src='x.png'>", "<hr>", "</br>"]))
+        elif roll < 0.88:
+            parts.append(f"<script>var s = '<p>{rng.choice(WORDS)}</p>';</script>")
+        elif roll < 0.92:
+            parts.append("<style>p { color: red; }</style>")
+        elif roll < 0.94:
+            parts.append(f"<!-- {rng.choice(WORDS)} -->")
+        elif roll < 0.96:
+            parts.append(f"<![CDATA[{rng.choice(WORDS)}]]>")
+        else:
+            parts.append(f"</{rng.choice(TEXT_TAGS)}>")
+    return "".join(parts)
+
+def make_document(rng: random.Random) -> Tuple[bytes, str, str]:
+    """(body, Content-Type, how the encoding is declared)"""
+    encoding = rng.choice(ENCODINGS)
+    declared = rng.choice(["header", "meta", "none"])
+    meta = f'<meta charset="{encoding}">' if declared == "meta" else ""
+    html = f"<html><head>{meta}<title>t</title></head><body>{make_fragment(rng)}</body></html>"
+    body = html.encode(encoding, errors="ignore")
+    content_type = f"text/html; charset={encoding}" if declared == "header" else "text/html"
+    return body, content_type, declared
+
+def time_per_document(fn, responses: List[FakeResponse]) -> float:
+    start = time.perf_counter()
+    for response in responses:
+        fn(response)
+    return 1e6 * (time.perf_counter() - start) / len(responses)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tool = RealDataExtractorTool()
+    documents = [make_document(rng) for _ in range(args.documents)]
+    responses = [FakeResponse(body, content_type) for body, content_type, _ in documents]
+
+    mismatches: List[Tuple[str, str]] = []
+    for (body, _, declared), response in zip(documents, responses):
+        # BeautifulSoup only sees the body, so it is given the header's charset explicitly
+        markup = body.decode(response.headers["Content-Type"].split("=")[1]) if declared == "header" else body
+        expected = tool._clean_html(markup)
+        if tool._stream_clean_html(response) != expected:
+            mismatches.append((declared, body[:80].decode("latin-1")))
+    by_declaration = {kind: sum(1 for _, _, declared in documents if declared == kind) for kind in ("header", "meta", "none")}
+    print(f"documents: {len(documents)} {by_declaration}  mismatches: {len(mismatches)}")
+    for declared, head in mismatches[:5]:
+        print(f"  [{declared}] {head!r}")
+
+    print(f"BeautifulSoup: {time_per_document(lambda r: tool._clean_html(r.content), responses):8.1f} us/doc")
+    print(f"streaming:     {time_per_document(tool._stream_clean_html, responses):8.1f} us/doc")
+    if mismatches:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
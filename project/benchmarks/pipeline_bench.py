@@ -0,0 +1,208 @@
+"""
+End-to-end pipeline benchmark against local stand-ins for Google Custom Search, the
+Hugging Face inference endpoint and web pages, so the real (non-mock) tool paths run
+fully offline. Goal decomposition uses the LLM tool's mock logic.
+
+    python -m project.benchmarks.pipeline_bench --sessions 200 --concurrency 16 --save base.json
+    python -m project.benchmarks.pipeline_bench --sessions 200 --concurrency 16 --compare base.json
+
+Reports sessions/s, p50/p95/p99 session latency, per-stage time (agents and tools) and
+stand-in traffic. Caches are disabled unless --with-caches is given, so every session
+does the full amount of work; the per-provider rate limits apply only with
+--with-rate-limits.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from project.benchmarks.standins import CustomSearchStandIn, HuggingFaceStandIn, PageStandIn
+from project.tools.rate_limit import rate_limiter_stats
+
+GOALS = [
+    "Learn Python basics", "Learn JavaScript", "Learn advanced JavaScript", "Learn DSA",
+    "Learn advanced algorithms", "Learn cloud computing", "Learn Rust",
+]
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+class StageTimer:
+    """Wraps bound methods on agent and tool instances to record per-stage latencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+
+    def wrap(self, stage: str, owner: Any, method: str):
+        original: Callable = getattr(owner, method)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.samples.setdefault(stage, []).append(elapsed)
+
+        # An instance attribute shadows the method for every caller of this object
+        setattr(owner, method, timed)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        stages = {}
+        for stage, values in sorted(self.samples.items()):
+            values = sorted(values)
+            stages[stage] = {
+                "calls": len(values),
+                "total_s": round(sum(values), 3),
+                "mean_ms": round(1000 * statistics.fmean(values), 2),
+                "p95_ms": round(1000 * percentile(values, 0.95), 2),
+            }
+        return stages
+
+def build_agent(args, search: CustomSearchStandIn, hf: HuggingFaceStandIn):
+    os.environ.update({
+        "GOOGLE_API_KEY": "bench-key",
+        "GOOGLE_CX_ID": "bench-cx",
+        "GOOGLE_CSE_API_URL": search.api_url,
+        "HUGGINGFACE_API_KEY": "bench-token",
+        "HUGGINGFACE_API_URL": hf.url,
+    })
+    from project.main_agent import MainAgent
+
+    config: Dict[str, Any] = {"worker_max_workers": args.worker_max_workers}
+    if not args.with_caches:
+        config.update({"extraction_cache": None, "llm_cache": None, "response_cache": None})
+    if not args.with_rate_limits:
+        config["rate_limits"] = None
+    agent = MainAgent(config)
+    # Decomposition stays on the mock logic (there is no Gemini stand-in); the client is
+    # created lazily, so clearing the key before first use keeps it from being built.
+    agent.tools["llm"].api_key = None
+    return agent
+
+def instrument(agent, timer: StageTimer):
+    for name in ("Planner", "Worker", "Evaluator"):
+        timer.wrap(f"agent.{name}", agent.agents[name], "handle_message")
+    timer.wrap("tool.llm", agent.tools["llm"], "decompose")
+    for name in ("search", "extractor", "summarizer"):
+        timer.wrap(f"tool.{name}", agent.tools[name], "execute")
+
+def run(args) -> Dict[str, Any]:
+    with PageStandIn(page_bytes=args.page_bytes, latency=args.page_latency, jitter=args.jitter, error_rate=args.error_rate, seed=1) as pages, \
+         HuggingFaceStandIn(request_latency=args.hf_latency, slots=args.hf_slots, jitter=args.jitter, error_rate=args.error_rate, seed=2) as hf, \
+         CustomSearchStandIn(pages.url, latency=args.search_latency, jitter=args.jitter, error_rate=args.error_rate, seed=3) as search:
+        agent = build_agent(args, search, hf)
+        timer = StageTimer()
+        instrument(agent, timer)
+
+        latencies: List[float] = []
+        failures = 0
+        lock = threading.Lock()
+
+        def session(index: int):
+            nonlocal failures
+            goal = f"{GOALS[index % len(GOALS)]} #{index}"
+            start = time.perf_counter()
+            result = agent.handle_message(goal)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not result or "error" in result:
+                    failures += 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(session, range(args.sessions)))
+        wall = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            "label": args.label,
+            "params": {
+                key: getattr(args, key) for key in (
+                    "sessions", "concurrency", "worker_max_workers", "with_caches", "with_rate_limits", "page_bytes",
+                    "search_latency", "page_latency", "hf_latency", "hf_slots", "jitter", "error_rate",
+                )
+            },
+            "sessions_per_second": round(args.sessions / wall, 2),
+            "failed_sessions": failures,
+            "latency_ms": {
+                "p50": round(1000 * percentile(latencies, 0.50), 1),
+                "p95": round(1000 * percentile(latencies, 0.95), 1),
+                "p99": round(1000 * percentile(latencies, 0.99), 1),
+                "max": round(1000 * latencies[-1], 1) if latencies else 0.0,
+            },
+            "stages": timer.report(),
+            "rate_limits": rate_limiter_stats() if args.with_rate_limits else {},
+            "standins": {
+                name: {"requests": standin.requests, "injected_errors": standin.errors}
+                for name, standin in (("search", search), ("pages", pages), ("hf", hf))
+            },
+        }
+
+def print_report(result: Dict[str, Any], baseline: Dict[str, Any] = None):
+    def delta(current: float, previous: float) -> str:
+        if not previous:
+            return ""
+        return f"  ({100 * (current - previous) / previous:+.1f}% vs {previous})"
+
+    base_latency = (baseline or {}).get("latency_ms", {})
+    base_stages = (baseline or {}).get("stages", {})
+    print(f"run: {result['label'] or '-'}" + (f"   baseline: {baseline.get('label') or '-'}" if baseline else ""))
+    print(f"sessions/s: {result['sessions_per_second']}{delta(result['sessions_per_second'], (baseline or {}).get('sessions_per_second'))}")
+    print(f"failed sessions: {result['failed_sessions']}")
+    for key, value in result["latency_ms"].items():
+        print(f"latency {key:<4} {value:9.1f} ms{delta(value, base_latency.get(key))}")
+    print(f"{'stage':<18} {'calls':>6} {'total_s':>9} {'mean_ms':>9} {'p95_ms':>9}")
+    for stage, row in result["stages"].items():
+        print(
+            f"{stage:<18} {row['calls']:>6} {row['total_s']:>9.3f} {row['mean_ms']:>9.2f} {row['p95_ms']:>9.2f}"
+            + delta(row["mean_ms"], base_stages.get(stage, {}).get("mean_ms"))
+        )
+    print(f"stand-ins: {result['standins']}")
+    if result.get("rate_limits"):
+        print(f"rate limits: {result['rate_limits']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--worker-max-workers", type=int, default=4)
+    parser.add_argument("--with-caches", action="store_true")
+    parser.add_argument("--with-rate-limits", action="store_true", help="apply the default per-provider rate limits")
+    parser.add_argument("--page-bytes", type=int, default=40_000)
+    parser.add_argument("--search-latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--page-latency", type=float, default=0.08, help="seconds")
+    parser.add_argument("--hf-latency", type=float, default=0.15, help="seconds per inference request")
+    parser.add_argument("--hf-slots", type=int, default=4)
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra uniform latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stand-in requests failing with HTTP 500")
+    parser.add_argument("--label", default="")
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --save")
+    args = parser.parse_args()
+
+    # Injected failures are counted per stand-in; the tools' fallback logging would drown the report
+    logging.disable(logging.ERROR)
+
+    result = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures SessionMemory write throughput (in-memory, write-behind, synchronous writes)
+and recovery time from the SQLite backend.
+
+    python -m project.benchmarks.session_store_bench --sessions 5000 --updates 4 --threads 8
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from project.memory.backends import SQLiteSessionBackend
+from project.memory.session_memory import SessionMemory
+
+def drive(memory: SessionMemory, sessions: int, updates: int, threads: int, sync_backend=None) -> float:
+    """Runs `updates` writes per session across threads; returns updates per second."""
+
+    def work(worker: int):
+        for index in range(worker, sessions, threads):
+            session_id = f"session-{index}"
+            for step in range(updates):
+                memory.update_session(session_id, {"goal": f"goal {index}", "step": step})
+                if sync_backend:
+                    # Baseline: persist on the request path, one transaction per update
+                    sync_backend.write_batch([(session_id, memory.get_session(session_id))])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(work, range(threads)))
+    return sessions * updates / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=4, help="updates per session")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--warm", type=int, default=1000, help="sessions preloaded on recovery")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rate = drive(SessionMemory(), args.sessions, args.updates, args.threads)
+        print(f"in-memory only        : {rate:10.0f} updates/s")
+
+        sync_backend = SQLiteSessionBackend(os.path.join(tmp, "sync.sqlite3"))
+        rate = drive(SessionMemory(), args.sessions, args.updates, args.threads, sync_backend=sync_backend)
+        sync_backend.close()
+        print(f"synchronous SQLite    : {rate:10.0f} updates/s")
+
+        path = os.path.join(tmp, "sessions.sqlite3")
+        memory = SessionMemory(backend=SQLiteSessionBackend(path))
+        rate = drive(memory, args.sessions, args.updates, args.threads)
+        start = time.perf_counter()
+        memory.flush()
+        drain = time.perf_counter() - start
+        print(f"write-behind SQLite   : {rate:10.0f} updates/s (drain {1000 * drain:.1f}ms, {memory.writer.stats()})")
+        memory.close()
+
+        # Recovery: a new process opens the database and warms its cache
+        start = time.perf_counter()
+        recovered = SessionMemory(backend=SQLiteSessionBackend(path))
+        opened = time.perf_counter() - start
+        warmed = recovered.warm(args.warm)
+        warm_time = time.perf_counter() - start - opened
+        start = time.perf_counter()
+        last = recovered.get_session("session-0")
+        read_through = time.perf_counter() - start
+        assert last.get("step") == args.updates - 1, last
+        print(
+            f"recovery              : open {1000 * opened:.1f}ms, warm {warmed} sessions {1000 * warm_time:.1f}ms, "
+            f"first read-through {1000 * read_through:.2f}ms"
+        )
+        recovered.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Local HTTP stand-ins for the external services used by the tools, for offline benchmarks.
+Each stand-in runs a ThreadingHTTPServer on 127.0.0.1 in a background thread, and can
+inject latency (plus uniform jitter) and a rate of HTTP 500 errors into every request.
+"""
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up early on purpose (e.g. the extractor stops reading at its size cap)
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+class StandInServer:
+    """Base class: serves `handler_class` on a free local port until stop() is called."""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        handler = type(self.handler_class.__name__, (self.handler_class,), {"standin": self})
+        self.server = _QuietServer(("127.0.0.1", port), handler)
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def inject(self) -> bool:
+        """Counts the request and sleeps latency + jitter; returns True if it should fail."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status: int, payload):
+        self.send_body(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def send_injected_error(self):
+        self.send_json(500, {"error": "Injected stand-in failure"})
+
+class _HuggingFaceHandler(_QuietHandler):
+    def do_POST(self):
+        standin = self.standin
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        inputs = payload.get("inputs", [])
+        texts = inputs if isinstance(inputs, list) else [inputs]
+        if standin.inject():
+            self.send_injected_error()
+            return
+
+        # Inference slots are limited, like a GPU-backed endpoint
+        with standin.slots:
+            time.sleep(standin.request_latency + standin.per_item_latency * len(texts))
+
+        self.send_json(200, [
+            {"summary_text": f"Stand-in summary of: {text[:60]}"} for text in texts
+        ])
+
+class HuggingFaceStandIn(StandInServer):
+    """
+    Mimics the HF Inference API for summarization models: POST {"inputs": str | [str, ...]}
+    returns [{"summary_text": ...}, ...]. Each request costs request_latency plus
+    per_item_latency per input, and at most `slots` requests are processed at once.
+    """
+
+    handler_class = _HuggingFaceHandler
+
+    def __init__(self, request_latency: float = 0.08, per_item_latency: float = 0.01, slots: int = 2, port: int = 0, **faults):
+        super().__init__(port, **faults)
+        self.request_latency = request_latency
+        self.per_item_latency = per_item_latency
+        self.slots = threading.BoundedSemaphore(slots)
+
+class _CustomSearchHandler(_QuietHandler):
+    def do_GET(self):
+        standin = self.standin
+        if standin.inject():
+            self.send_injected_error()
+            return
+        params = parse_qs(urlsplit(self.path).query)
+        query = params.get("q", [""])[0]
+        num = int(params.get("num", ["3"])[0])
+        slug = hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]
+        self.send_json(200, {"items": [
+            {
+                "link": f"{standin.pages_url}/page/{slug}-{i}",
+                "title": f"The Ultimate Guide to {query} ({i})",
+            }
+            for i in range(num)
+        ]})
+
+class CustomSearchStandIn(StandInServer):
+    """
+    Mimics the Google Custom Search JSON API: GET ?q=...&num=N returns N items whose
+    links point at pages served by a PageStandIn at pages_url.
+    """
+
+    handler_class = _CustomSearchHandler
+
+    def __init__(self, pages_url: str, port: int = 0, **faults):
+        super().__init__(port, **faults)
+        self.pages_url = pages_url
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/customsearch/v1"
+
+class _PageHandler(_QuietHandler):
+    def do_GET(self):
+        standin = self.standin
+        if standin.inject():
+            self.send_injected_error()
+            return
+        body = standin.render(self.path)
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_body(200, body, "text/html; charset=utf-8", {"ETag": etag})
+
+# Words mixed into page paragraphs, so that pages at different paths are not near-duplicates
+_PAGE_WORDS = (
+    "array list graph tree heap queue stack hash map set loop branch function closure class "
+    "object module package import variable constant type string integer float boolean record "
+    "pointer memory cache thread process lock socket request response server client schema "
+    "index query table join filter sort search merge split parse render route deploy test"
+).split()
+
+class PageStandIn(StandInServer):
+    """
+    Serves deterministic article-like HTML pages of roughly page_bytes for any path. The
+    wording is seeded by the path, so distinct paths serve distinct content.
+    """
+
+    handler_class = _PageHandler
+
+    def __init__(self, page_bytes: int = 40_000, port: int = 0, **faults):
+        super().__init__(port, **faults)
+        self.page_bytes = page_bytes
+
+    def render(self, path: str) -> bytes:
+        words = random.Random(path)
+        parts = [
+            "<html><head><title>Stand-in page</title><style>p { margin: 0 }</style>"
+            "<script>var tracking = 1;</script></head><body><nav><ul><li>Home</li><li>Docs</li></ul></nav>",
+            f"<h1>Article at {path}</h1>",
+        ]
+        size = sum(len(part) for part in parts)
+        section = 0
+        while size < self.page_bytes:
+            section += 1
+            chunk = (
+                f"<h2>Section {section}</h2>"
+                f"<p>Paragraph {section} of {path} explains the concept step by step, with examples "
+                "and common pitfalls, so a learner can follow along and practise on their own. "
+                f"It covers {' '.join(words.choices(_PAGE_WORDS, k=12))}.</p>"
+                f"<div class='ad'><span>Sponsored block {section}</span></div>"
+            )
+            parts.append(chunk)
+            size += len(chunk)
+        parts.append("</body></html>")
+        return "".join(parts).encode("utf-8")
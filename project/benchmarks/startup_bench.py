@@ -0,0 +1,82 @@
+"""
+Cold-start benchmark. Each run starts a fresh interpreter and measures the import time of
+project.main_agent, MainAgent construction, and the first and second request latency
+(mock tools, no caches), plus which heavy modules got loaded along the way.
+
+    python -m project.benchmarks.startup_bench --runs 5 --max-import-ms 400
+
+With --max-import-ms / --max-first-request-ms the exit status is 1 when the median
+exceeds the budget, so the benchmark can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["requests", "bs4", "google.genai", "pydantic"]
+
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+import project.main_agent as main_agent
+imported = time.perf_counter()
+agent = main_agent.MainAgent({"extraction_cache": None, "llm_cache": None, "response_cache": None})
+constructed = time.perf_counter()
+loaded_before = [name for name in HEAVY if name in sys.modules]
+agent.handle_message("Learn Python basics")
+first = time.perf_counter()
+agent.handle_message("Learn JavaScript")
+second = time.perf_counter()
+print(json.dumps({
+    "import_ms": 1000 * (imported - start),
+    "construct_ms": 1000 * (constructed - imported),
+    "first_request_ms": 1000 * (first - constructed),
+    "second_request_ms": 1000 * (second - first),
+    "loaded_before_first_request": loaded_before,
+    "loaded_after_requests": [name for name in HEAVY if name in sys.modules],
+}))
+"""
+
+def probe() -> dict:
+    env = dict(os.environ)
+    # Mock mode: the benchmark measures our start-up cost, not provider latency
+    for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "HUGGINGFACE_API_KEY"):
+        env.pop(key, None)
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [project_root, env.get("PYTHONPATH")]))
+    script = f"HEAVY = {HEAVY_MODULES!r}\n{PROBE}"
+    output = subprocess.run(
+        [sys.executable, "-c", script], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-first-request-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    medians = {
+        metric: statistics.median(run[metric] for run in runs)
+        for metric in ("import_ms", "construct_ms", "first_request_ms", "second_request_ms")
+    }
+    for metric, value in medians.items():
+        print(f"{metric:<20} median={value:8.1f}ms  min={min(run[metric] for run in runs):8.1f}ms")
+    print(f"heavy modules loaded before the first request: {runs[-1]['loaded_before_first_request']}")
+    print(f"heavy modules loaded after two mock requests:  {runs[-1]['loaded_after_requests']}")
+
+    failed = False
+    if args.max_import_ms is not None and medians["import_ms"] > args.max_import_ms:
+        print(f"FAIL: import time {medians['import_ms']:.1f}ms exceeds {args.max_import_ms}ms")
+        failed = True
+    if args.max_first_request_ms is not None and medians["first_request_ms"] > args.max_first_request_ms:
+        print(f"FAIL: first request {medians['first_request_ms']:.1f}ms exceeds {args.max_first_request_ms}ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compares RealTextSummarizerTool throughput with and without micro-batching against a
+local Hugging Face stand-in.
+
+    python -m project.benchmarks.summarizer_batching_bench --requests 200 --concurrency 32
+"""
+import argparse
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from project.benchmarks.standins import HuggingFaceStandIn
+from project.tools.tools import RealTextSummarizerTool
+
+def run(standin: HuggingFaceStandIn, requests: int, concurrency: int, batch_size: int, batch_wait_ms: float):
+    tool = RealTextSummarizerTool("bench-token", api_url=standin.url, batch_size=batch_size, batch_wait_ms=batch_wait_ms)
+    texts = [f"Resource {i}: " + "lorem ipsum dolor sit amet " * 20 for i in range(requests)]
+    latencies = []
+
+    def call(text):
+        start = time.perf_counter()
+        tool.execute(text)
+        latencies.append(time.perf_counter() - start)
+
+    standin.requests = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, texts))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"batch_size={batch_size:<3} wait={batch_wait_ms:>5.1f}ms  "
+        f"throughput={requests / elapsed:8.1f} req/s  "
+        f"p50={1000 * statistics.median(latencies):7.1f}ms  "
+        f"p95={1000 * latencies[int(0.95 * (len(latencies) - 1))]:7.1f}ms  "
+        f"http_requests={standin.requests}"
+        + (f"  batcher={tool.batcher.stats()}" if tool.batcher else "")
+    )
+    if tool.batcher:
+        tool.batcher.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--batch-wait-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with HuggingFaceStandIn() as standin:
+        for batch_size in args.batch_sizes:
+            run(standin, args.requests, args.concurrency, batch_size, args.batch_wait_ms)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import itertools
+import math
+import os
+import struct
 import time
 
+import pydantic_core
+
 class A2AMessage(BaseModel):
     """Structured message for Agent-to-Agent (A2A) communication."""
     sender: str = Field(..., description="The name of the sending agent.")
@@ -10,18 +16,169 @@ class A2AMessage(BaseModel):
     timestamp: float = Field(default_factory=time.time, description="Timestamp of message creation.")
     content: Dict[str, Any] = Field(..., description="The core payload of the message (task or result).")
     session_id: str = Field(..., description="The persistent ID for the user's session.")
+    deadline: Optional[float] = Field(default=None, description="Wall-clock time (time.time()) by which the session must answer; None for no budget.")
+
+    @classmethod
+    def trusted(
+        cls, sender: str, recipient: str, task_id: str, content: Dict[str, Any], session_id: str,
+        timestamp: Optional[float] = None, deadline: Optional[float] = None,
+    ) -> "A2AMessage":
+        """
+        Builds a message without validation, for values already known to have the right
+        types (e.g. taken from another message). Unlike model_construct, which still walks
+        the field defaults, this only fills the instance dict, so it is cheaper than
+        validating; the result is indistinguishable from a validated message.
+        """
+        message = _new_object(cls)
+        if timestamp is None:
+            timestamp = time.time()
+            fields_set = set(_FIELDS_WITHOUT_TIMESTAMP)
+        else:
+            fields_set = set(_ALL_FIELDS)
+        _set_attribute(message, "__dict__", {
+            "sender": sender,
+            "recipient": recipient,
+            "task_id": task_id,
+            "timestamp": timestamp,
+            "content": content,
+            "session_id": session_id,
+            "deadline": deadline,
+        })
+        _set_attribute(message, "__pydantic_fields_set__", fields_set)
+        _set_attribute(message, "__pydantic_extra__", None)
+        _set_attribute(message, "__pydantic_private__", None)
+        return message
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (negative once it has passed), or None without one."""
+        return None if self.deadline is None else self.deadline - time.time()
+
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+_ALL_FIELDS = frozenset(A2AMessage.model_fields)
+_FIELDS_WITHOUT_TIMESTAMP = _ALL_FIELDS - {"timestamp"}
+
+# Task IDs are "<sender>_<recipient>_<process token>-<counter>". The token combines the pid
+# with the process start time, so IDs stay unique across processes, restarts and forks.
+_PROCESS_TOKEN = f"{os.getpid():x}{int(time.time() * 1000):x}"
+_task_counter = itertools.count(1)
+_task_counter_pid = os.getpid()
+
+def new_task_id(sender: str, recipient: str) -> str:
+    global _PROCESS_TOKEN, _task_counter, _task_counter_pid
+    pid = os.getpid()
+    if pid != _task_counter_pid:
+        # Forked child: take a fresh token instead of replaying the parent's counter
+        _PROCESS_TOKEN = f"{pid:x}{int(time.time() * 1000):x}"
+        _task_counter = itertools.count(1)
+        _task_counter_pid = pid
+    # next() on itertools.count is atomic under the GIL
+    return f"{sender}_{recipient}_{_PROCESS_TOKEN}-{next(_task_counter)}"
+
+# Binary wire format, version 2 (little endian):
+#   magic "A2" | version u8 | timestamp f64 | deadline f64 (NaN for none)
+#   sender, recipient, task_id, session_id: u16 length + UTF-8 bytes each
+#   content: u32 length + compact UTF-8 JSON
+# The routing fields come first, so a broker can peek() at them without parsing the content.
+# Version 1 frames (no deadline field) are still accepted by decode().
+_MAGIC = b"A2"
+_VERSION = 2
+_PREFIX = struct.Struct("<2sB")
+_HEADERS = {1: struct.Struct("<2sBd"), 2: struct.Struct("<2sBdd")}
+_SHORT_LEN = struct.Struct("<H")
+_MAX_SHORT_LEN = 0xFFFF
+_LONG_LEN = struct.Struct("<I")
 
 class Protocol:
     """Handles the creation and passing of structured messages."""
 
     @staticmethod
-    def create_message(sender: str, recipient: str, content: Dict[str, Any], session_id: str, task_id: Optional[str] = None) -> A2AMessage:
+    def create_message(sender: str, recipient: str, content: Dict[str, Any], session_id: str, task_id: Optional[str] = None, deadline: Optional[float] = None, trusted: bool = False) -> A2AMessage:
+        """
+        Builds a message. With trusted=True it is not validated (see A2AMessage.trusted);
+        agents use that for hops built from an already validated message.
+        """
         if task_id is None:
-            task_id = f"{sender}_{recipient}_{int(time.time() * 1000)}"
+            task_id = new_task_id(sender, recipient)
+        if trusted:
+            return A2AMessage.trusted(sender, recipient, task_id, content, session_id, deadline=deadline)
         return A2AMessage(
             sender=sender,
             recipient=recipient,
             task_id=task_id,
             content=content,
-            session_id=session_id
+            session_id=session_id,
+            deadline=deadline
         )
+
+    @staticmethod
+    def encode(message: A2AMessage) -> bytes:
+        """
+        Serializes a message to the binary wire format. Raises ValueError if a routing
+        field is longer than 65535 bytes or the content is not JSON-serializable.
+        """
+        deadline = message.deadline if message.deadline is not None else math.nan
+        parts = [_HEADERS[_VERSION].pack(_MAGIC, _VERSION, message.timestamp, deadline)]
+        for name in ("sender", "recipient", "task_id", "session_id"):
+            raw = getattr(message, name).encode("utf-8")
+            if len(raw) > _MAX_SHORT_LEN:
+                raise ValueError(f"A2A message {name} is {len(raw)} bytes; the wire format allows {_MAX_SHORT_LEN}.")
+            parts.append(_SHORT_LEN.pack(len(raw)))
+            parts.append(raw)
+        try:
+            content = pydantic_core.to_json(message.content)
+        except pydantic_core.PydanticSerializationError as e:
+            # Stringifying the value instead would make decode(encode(m)) != m
+            raise ValueError(f"A2A message content is not JSON-serializable: {e}") from e
+        parts.append(_LONG_LEN.pack(len(content)))
+        parts.append(content)
+        return b"".join(parts)
+
+    @staticmethod
+    def _read_header(data: bytes) -> Tuple[float, Optional[float], List[str], int]:
+        magic, version = _PREFIX.unpack_from(data, 0)
+        header = _HEADERS.get(version)
+        if magic != _MAGIC or header is None:
+            raise ValueError(f"Unsupported A2A wire format (magic={magic!r}, version={version}).")
+        timestamp, *rest = header.unpack_from(data, 0)[2:]
+        deadline = rest[0] if rest and not math.isnan(rest[0]) else None
+        offset = header.size
+        fields = []
+        for _ in range(4):
+            (length,) = _SHORT_LEN.unpack_from(data, offset)
+            offset += _SHORT_LEN.size
+            fields.append(bytes(data[offset:offset + length]).decode("utf-8"))
+            offset += length
+        return timestamp, deadline, fields, offset
+
+    @staticmethod
+    def peek(data: bytes) -> Dict[str, str]:
+        """
+        Reads only the routing fields (sender, recipient, task_id, session_id) of an
+        encoded message, without parsing its content.
+        """
+        try:
+            _, _, fields, _ = Protocol._read_header(data)
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Malformed A2A message: {e}") from e
+        return dict(zip(("sender", "recipient", "task_id", "session_id"), fields))
+
+    @staticmethod
+    def decode(data: bytes) -> A2AMessage:
+        """Inverse of encode(). Raises ValueError on malformed or truncated input."""
+        try:
+            timestamp, deadline, fields, offset = Protocol._read_header(data)
+            (length,) = _LONG_LEN.unpack_from(data, offset)
+            offset += _LONG_LEN.size
+            if offset + length != len(data):
+                raise ValueError("A2A message length does not match its header.")
+            content = pydantic_core.from_json(bytes(data[offset:]))
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Malformed A2A message: {e}") from e
+
+        # Frames may come from another process. The format itself types every field but
+        # the content, so only that needs checking before the message is built unvalidated.
+        if not isinstance(content, dict):
+            raise ValueError(f"A2A message content must be a JSON object, not {type(content).__name__}.")
+        sender, recipient, task_id, session_id = fields
+        return A2AMessage.trusted(sender, recipient, task_id, content, session_id, timestamp=timestamp, deadline=deadline)
@@ -0,0 +1,119 @@
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from project.core import observability
+
+# Setup logger
+deadline_logger = logging.getLogger("Deadline")
+
+# Absolute time.time() deadline of the session being served on this thread/task. Agents
+# bind it from A2AMessage.deadline with deadline_scope(); tools read it via time_left().
+_deadline: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar("edumentor_deadline", default=None)
+
+
+class deadline_scope:
+    """Binds a session deadline for the calls made inside the block (None leaves it unset)."""
+
+    __slots__ = ("deadline", "_token")
+
+    def __init__(self, deadline: Optional[float]):
+        self.deadline = deadline
+        self._token = None
+
+    def __enter__(self) -> "deadline_scope":
+        if self.deadline is not None:
+            self._token = _deadline.set(self.deadline)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _deadline.reset(self._token)
+        return False
+
+
+def current_deadline() -> Optional[float]:
+    return _deadline.get()
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current deadline (negative once it has passed), or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.time()
+
+
+def has_budget(seconds: float) -> bool:
+    """Whether at least `seconds` remain before the current deadline (always True without one)."""
+    left = time_left()
+    return left is None or left >= seconds
+
+
+def clamp_timeout(timeout: Any, floor: float = 0.5) -> Any:
+    """
+    Caps a requests-style timeout (seconds, or a (connect, read) tuple) to the time left,
+    never below floor, so a call started near the deadline cannot run far past it.
+    """
+    left = time_left()
+    if left is None:
+        return timeout
+    cap = max(floor, left)
+    if isinstance(timeout, tuple):
+        return tuple(min(part, cap) for part in timeout)
+    return min(timeout, cap)
+
+
+class BudgetStats:
+    """Process-wide counts of deadline overruns (per stage) and graceful degradations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.overruns: Dict[str, Dict[str, float]] = {}
+        self.degradations: Dict[Tuple[str, str], int] = {}
+
+    def record_overrun(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self.overruns.setdefault(stage, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def record_degradation(self, stage: str, action: str):
+        with self._lock:
+            key = (stage, action)
+            self.degradations[key] = self.degradations.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "overruns": {
+                    stage: {**entry, "seconds": round(entry["seconds"], 4), "max_seconds": round(entry["max_seconds"], 4)}
+                    for stage, entry in self.overruns.items()
+                },
+                "degradations": {f"{stage}:{action}": count for (stage, action), count in self.degradations.items()},
+            }
+
+
+budget_stats = BudgetStats()
+
+
+def record_overrun(stage: str, deadline: Optional[float] = None) -> bool:
+    """Records that `stage` finished after the deadline (the current one by default)."""
+    deadline = deadline if deadline is not None else _deadline.get()
+    if deadline is None:
+        return False
+    over = time.time() - deadline
+    if over <= 0:
+        return False
+    budget_stats.record_overrun(stage, over)
+    observability.inc(observability.DEADLINE_OVERRUNS, stage=stage)
+    deadline_logger.warning("Stage %s finished %.2fs past the session deadline.", stage, over)
+    return True
+
+
+def record_degradation(stage: str, action: str):
+    """Records that `stage` degraded its output (e.g. skipped a call) to stay within budget."""
+    budget_stats.record_degradation(stage, action)
+    observability.inc(observability.DEGRADATIONS, stage=stage, action=action)
+    deadline_logger.info("Stage %s degraded (%s) to stay within the session budget.", stage, action)
@@ -0,0 +1,268 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from project.core import observability
+from project.core.a2a_protocol import A2AMessage
+from project.core.deadline import record_overrun
+from project.core.observability import log_context, span
+
+# Setup logger
+bus_logger = logging.getLogger("MessageBus")
+
+class BusFullError(RuntimeError):
+    """Raised when a new session cannot be admitted before the submit timeout."""
+
+class _Inbox:
+    """Bounded queue of (enqueued_at, message) for one agent, plus its counters."""
+
+    def __init__(self, name: str, agent: Any, consumers: int, capacity: int):
+        self.name = name
+        self.agent = agent
+        self.consumers = consumers
+        self.queue: "queue.Queue[Optional[Tuple[float, A2AMessage]]]" = queue.Queue(maxsize=capacity)
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0
+        self.blocked_puts = 0
+        self.max_depth = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.handle_seconds = 0.0
+
+class MessageBus:
+    """
+    Queue-based runtime for A2A messages. Every agent gets a bounded inbox drained by its
+    own pool of consumer threads, so each stage scales independently (e.g. 1 Planner,
+    16 Workers, 2 Evaluators) and a slow stage no longer blocks other sessions.
+
+    Replies are routed to the recipient's inbox; a reply addressed to the terminal agent
+    ("MainAgent") completes the Future returned by submit() for that session.
+
+    Backpressure is applied at admission: at most max_in_flight sessions are inside the
+    bus, and submit() blocks (or raises BusFullError after its timeout) beyond that.
+    A session holds exactly one message at any time, so as long as every inbox can hold
+    max_in_flight messages the Planner -> Worker -> Evaluator -> Planner cycle can never
+    deadlock on full queues. Sessions that call the agents themselves (streamed ones) take
+    an admission slot with admit(), so they count against the same bound.
+    """
+
+    def __init__(
+        self,
+        agents: Dict[str, Any],
+        consumers: Optional[Dict[str, int]] = None,
+        inbox_size: int = 64,
+        max_in_flight: Optional[int] = None,
+        terminal: str = "MainAgent",
+    ):
+        consumers = consumers or {}
+        self.terminal = terminal
+        self.max_in_flight = min(max_in_flight or inbox_size, inbox_size)
+        self._inboxes = {
+            name: _Inbox(name, agent, max(1, consumers.get(name, 1)), inbox_size)
+            for name, agent in agents.items()
+        }
+        self._admission = threading.BoundedSemaphore(self.max_in_flight)
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._admitted_outside = 0
+        self._threads: List[threading.Thread] = []
+        self._started = False
+        self._start_lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            for inbox in self._inboxes.values():
+                for i in range(inbox.consumers):
+                    thread = threading.Thread(
+                        target=self._consume, args=(inbox,), name=f"bus-{inbox.name}-{i}", daemon=True
+                    )
+                    thread.start()
+                    self._threads.append(thread)
+            self._started = True
+        bus_logger.info(
+            "MessageBus started with consumers: "
+            + ", ".join(f"{inbox.name}={inbox.consumers}" for inbox in self._inboxes.values())
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """Stops the consumers once they finish their current message; queued messages are dropped."""
+        with self._start_lock:
+            if not self._started:
+                return
+            self._started = False
+        for inbox in self._inboxes.values():
+            for _ in range(inbox.consumers):
+                # Sentinels bypass the bound so stop() never blocks on a full inbox
+                with inbox.queue.mutex:
+                    inbox.queue.queue.append(None)
+                    inbox.queue.not_empty.notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            self._admission = threading.BoundedSemaphore(self.max_in_flight)
+        for future in pending.values():
+            future.set_exception(RuntimeError("MessageBus stopped before the session completed."))
+
+    def submit(self, message: A2AMessage, timeout: Optional[float] = None) -> Future:
+        """
+        Admits a new session and returns a Future resolved with the content of the
+        message that eventually reaches the terminal agent.
+        """
+        if not self._started:
+            self.start()
+        if message.recipient not in self._inboxes:
+            raise KeyError(f"Unknown agent recipient: {message.recipient}")
+        if not self._admission.acquire(timeout=timeout):
+            with self._pending_lock:
+                self.rejected += 1
+            raise BusFullError(f"{self.max_in_flight} sessions already in flight.")
+
+        future: Future = Future()
+        with self._pending_lock:
+            if message.session_id in self._pending:
+                self._admission.release()
+                raise ValueError(f"Session {message.session_id} is already in flight.")
+            self._pending[message.session_id] = future
+            self.submitted += 1
+        self._put(self._inboxes[message.recipient], message)
+        return future
+
+    def admit(self, timeout: Optional[float] = None) -> Callable[[], None]:
+        """
+        Admits a session whose messages do not go through the inboxes (the caller runs
+        the agents), blocking like submit(). Returns the function that ends the session;
+        calling it more than once has no effect.
+        """
+        admission = self._admission
+        if not admission.acquire(timeout=timeout):
+            with self._pending_lock:
+                self.rejected += 1
+            raise BusFullError(f"{self.max_in_flight} sessions already in flight.")
+        with self._pending_lock:
+            self._admitted_outside += 1
+            self.submitted += 1
+        released = threading.Event()
+
+        def release():
+            with self._pending_lock:
+                if released.is_set():
+                    return
+                released.set()
+                self._admitted_outside -= 1
+                self.completed += 1
+            # stop() replaces the semaphore; the slot belongs to the one it came from
+            admission.release()
+        return release
+
+    def request(self, message: A2AMessage, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(message, timeout=timeout).result(timeout=timeout)
+
+    def _put(self, inbox: _Inbox, message: A2AMessage):
+        item = (time.perf_counter(), message)
+        try:
+            inbox.queue.put_nowait(item)
+        except queue.Full:
+            with inbox.lock:
+                inbox.blocked_puts += 1
+            inbox.queue.put(item)
+        depth = inbox.queue.qsize()
+        with inbox.lock:
+            inbox.max_depth = max(inbox.max_depth, depth)
+
+    def _finish(self, session_id: str, content: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None):
+        with self._pending_lock:
+            future = self._pending.pop(session_id, None)
+            if future is None:
+                return
+            self.completed += 1
+        self._admission.release()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(content)
+
+    def _consume(self, inbox: _Inbox):
+        while True:
+            item = inbox.queue.get()
+            if item is None:
+                return
+            enqueued_at, message = item
+            started = time.perf_counter()
+            wait = started - enqueued_at
+            with inbox.lock:
+                inbox.busy += 1
+                inbox.wait_seconds += wait
+                inbox.max_wait_seconds = max(inbox.max_wait_seconds, wait)
+
+            try:
+                # Consumer threads do not share the caller's context, so bus hops are
+                # traced as root spans tagged with their session
+                with span(f"hop {inbox.name}", metric=observability.HOP_SECONDS, labels={"agent": inbox.name},
+                          session_id=message.session_id, sender=message.sender, task_id=message.task_id), \
+                        log_context(session_id=message.session_id, task_id=message.task_id):
+                    reply = inbox.agent.handle_message(message)
+                record_overrun(inbox.name, message.deadline)
+            except Exception as e:
+                bus_logger.error(f"{inbox.name} failed on session {message.session_id}: {e}")
+                observability.inc(observability.ERRORS, component=inbox.name)
+                with inbox.lock:
+                    inbox.errors += 1
+                self._finish(message.session_id, error=e)
+                reply = None
+            finally:
+                with inbox.lock:
+                    inbox.busy -= 1
+                    inbox.processed += 1
+                    inbox.handle_seconds += time.perf_counter() - started
+
+            if reply is None:
+                continue
+            if reply.recipient == self.terminal:
+                self._finish(reply.session_id, content=reply.content)
+            elif reply.recipient in self._inboxes:
+                self._put(self._inboxes[reply.recipient], reply)
+            else:
+                bus_logger.error(f"Unknown recipient: {reply.recipient}")
+                self._finish(reply.session_id, content={"error": f"Unknown agent recipient: {reply.recipient}"})
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-agent queue depth, wait and service times, plus session counters."""
+        agents = {}
+        for inbox in self._inboxes.values():
+            with inbox.lock:
+                agents[inbox.name] = {
+                    "consumers": inbox.consumers,
+                    "busy": inbox.busy,
+                    "depth": inbox.queue.qsize(),
+                    "capacity": inbox.queue.maxsize,
+                    "max_depth": inbox.max_depth,
+                    "blocked_puts": inbox.blocked_puts,
+                    "processed": inbox.processed,
+                    "errors": inbox.errors,
+                    "avg_wait_ms": round(1000 * inbox.wait_seconds / inbox.processed, 3) if inbox.processed else 0.0,
+                    "max_wait_ms": round(1000 * inbox.max_wait_seconds, 3),
+                    "avg_handle_ms": round(1000 * inbox.handle_seconds / inbox.processed, 3) if inbox.processed else 0.0,
+                }
+        with self._pending_lock:
+            return {
+                "in_flight": len(self._pending) + self._admitted_outside,
+                "max_in_flight": self.max_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "agents": agents,
+            }
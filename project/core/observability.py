@@ -1,8 +1,34 @@
+import atexit
+import bisect
+import contextvars
+import copy
+import itertools
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-def setup_logging(level=logging.INFO):
-    """Sets up a centralized, structured logging system."""
+def setup_logging(
+    level=logging.INFO,
+    json_format: bool = False,
+    background: bool = False,
+    sampling: Optional[Dict[str, float]] = None,
+):
+    """
+    Sets up a centralized, structured logging system.
+
+    json_format writes one JSON object per line, including the session_id and task_id
+    bound with log_context(). background moves formatting and the stdout write to a
+    listener thread behind a queue, so request threads only enqueue records. sampling
+    maps logger names to the fraction of their INFO-and-below records to keep, e.g.
+    {"Evaluator": 0.1}; warnings and errors are never sampled out.
+    """
 
     # Check if handler already exists to prevent duplicate output in notebooks
     if logging.getLogger().hasHandlers():
@@ -16,15 +42,422 @@ def setup_logging(level=logging.INFO):
     c_handler.setLevel(level)
 
     # Formatter for structured logs
-    formatter = logging.Formatter(
-        '[%(levelname)s] [%(name)s] (%(asctime)s) - %(message)s',
-        datefmt='%H:%M:%S'
-    )
+    if json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '[%(levelname)s] [%(name)s] (%(asctime)s) - %(message)s',
+            datefmt='%H:%M:%S'
+        )
     c_handler.setFormatter(formatter)
 
+    # Context and sampling are resolved on the logging thread, before any queueing
+    entry_handler: logging.Handler = c_handler
+    if background:
+        global _listener
+        entry_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        entry_handler.setLevel(level)
+        _listener = logging.handlers.QueueListener(entry_handler.queue, c_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    entry_handler.addFilter(_ContextFilter())
+    if sampling:
+        entry_handler.addFilter(SamplingFilter(sampling))
+
     # Add handler to the logger
-    logger.addHandler(c_handler)
+    logger.addHandler(entry_handler)
     logger.info("Observability system initialized.")
 
-# Initialize logging immediately upon import
-setup_logging()
+def shutdown_logging():
+    """Flushes and stops the background log listener, if setup_logging started one."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+# --- Structured logging ---
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_log_context: "contextvars.ContextVar[Optional[Dict[str, Any]]]" = contextvars.ContextVar("edumentor_log_context", default=None)
+
+class log_context:
+    """
+    Binds fields (e.g. session_id, task_id) to every record logged inside the block,
+    on top of any fields bound by enclosing blocks.
+    """
+
+    __slots__ = ("fields", "_token")
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self._token = None
+
+    def __enter__(self) -> "log_context":
+        current = _log_context.get()
+        self._token = _log_context.set({**current, **self.fields} if current else self.fields)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _log_context.reset(self._token)
+        return False
+
+class _ContextFilter(logging.Filter):
+    """Copies the bound log_context fields onto each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = _log_context.get()
+        if fields:
+            for key, value in fields.items():
+                setattr(record, key, value)
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the INFO-and-below records of selected loggers: with a rate of
+    0.1, every tenth record of that logger passes. Deterministic, so runs are comparable.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.intervals = {name: max(1, round(1 / rate)) if rate > 0 else 0 for name, rate in rates.items()}
+        self._counts = {name: itertools.count() for name in rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        interval = self.intervals.get(record.name)
+        if interval is None or record.levelno > logging.INFO:
+            return True
+        if interval == 0:
+            return False
+        return next(self._counts[record.name]) % interval == 0
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records with only the %-interpolation done on the calling thread (so later
+    mutation of the arguments cannot change the message); the formatter and the stream
+    write run on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the log_context fields when present."""
+
+    CONTEXT_FIELDS = ("session_id", "task_id")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage().strip(),
+        }
+        for field in self.CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+# --- Tracing and metrics ---
+#
+# Instrumentation is process-wide and off by default. While disabled, span(), inc() and
+# observe() return after a single flag check, so the hooks in the router, agents and tools
+# cost next to nothing. enable_instrumentation() turns on:
+#   - spans per session, per A2A hop and per tool call, linked through contextvars
+#     (exportable as OpenTelemetry/OTLP-JSON compatible dicts),
+#   - latency histograms and counters (fallbacks to mock, cache lookups, errors),
+#     exportable in the Prometheus text format.
+
+# Metric names used by the built-in instrumentation
+SESSION_SECONDS = "edumentor_session_seconds"
+HOP_SECONDS = "edumentor_hop_seconds"
+TOOL_SECONDS = "edumentor_tool_seconds"
+SESSIONS = "edumentor_sessions_total"
+ERRORS = "edumentor_errors_total"
+MOCK_FALLBACKS = "edumentor_mock_fallbacks_total"
+CACHE_LOOKUPS = "edumentor_cache_lookups_total"
+THROTTLE_SECONDS = "edumentor_throttle_wait_seconds"
+THROTTLE_REJECTIONS = "edumentor_throttle_rejections_total"
+BREAKER_STATE = "edumentor_circuit_breaker_state"
+BREAKER_REJECTIONS = "edumentor_circuit_breaker_rejections_total"
+RETRIES = "edumentor_retries_total"
+HEDGES = "edumentor_hedged_requests_total"
+DEADLINE_OVERRUNS = "edumentor_deadline_overruns_total"
+DEGRADATIONS = "edumentor_degradations_total"
+DUPLICATES = "edumentor_duplicates_skipped_total"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = False
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and fixed-bucket histograms keyed by name and label set."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._histograms: Dict[Tuple[str, LabelKey], _Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        key = (name, _label_key(labels))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view: counters by name and labels, histograms as count/sum/mean."""
+        with self._lock:
+            counters = {f"{name}{_format_labels(labels)}": value for (name, labels), value in self._counters.items()}
+            gauges = {f"{name}{_format_labels(labels)}": value for (name, labels), value in self._gauges.items()}
+            histograms = {
+                f"{name}{_format_labels(labels)}": {
+                    "count": h.count, "sum": round(h.sum, 6), "mean": round(h.sum / h.count, 6) if h.count else 0.0
+                }
+                for (name, labels), h in self._histograms.items()
+            }
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def prometheus_text(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(
+                ((key, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()),
+                key=lambda item: item[0]
+            )
+
+        lines: List[str] = []
+        typed = set()
+        for kind, series in (("counter", counters), ("gauge", gauges)):
+            for (name, labels), value in series:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} {kind}")
+                    typed.add(name)
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), counts, total, count in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items())) if labels else ()
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+metrics = MetricsRegistry()
+
+def inc(name: str, amount: float = 1, **labels):
+    """Increments a counter; a no-op while instrumentation is disabled."""
+    if _enabled:
+        metrics.inc(name, amount, labels)
+
+def set_gauge(name: str, value: float, **labels):
+    """Sets a gauge; a no-op while instrumentation is disabled."""
+    if _enabled:
+        metrics.set_gauge(name, value, labels)
+
+def observe(name: str, value: float, **labels):
+    """Records a histogram sample; a no-op while instrumentation is disabled."""
+    if _enabled:
+        metrics.observe(name, value, labels)
+
+class Span:
+    """A timed operation; finished spans are kept in a bounded buffer for export."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "end_ns",
+                 "status", "metric", "metric_labels", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"], metric: Optional[str], metric_labels: Optional[Dict[str, Any]], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.metric = metric
+        self.metric_labels = metric_labels
+        self.status = "OK"
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.status = "ERROR"
+            self.attributes["exception.type"] = exc_type.__name__
+        if self.metric:
+            metrics.observe(self.metric, (self.end_ns - self.start_ns) / 1e9, self.metric_labels)
+        _finish_span(self)
+        return False
+
+    def to_otel(self) -> Dict[str, Any]:
+        """The span in the OTLP/JSON span shape."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otel_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2 if self.status == "ERROR" else 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("edumentor_span", default=None)
+_finished_spans: "deque[Span]" = deque(maxlen=2048)
+_span_exporter: Optional[Callable[[Span], None]] = None
+
+def _otel_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _finish_span(span: Span):
+    _finished_spans.append(span)
+    if _span_exporter is not None:
+        try:
+            _span_exporter(span)
+        except Exception as e:
+            logging.getLogger("Observability").error(f"Span exporter failed: {e}")
+
+def span(name: str, metric: Optional[str] = None, labels: Optional[Dict[str, Any]] = None, **attributes):
+    """
+    Context manager timing one operation as a child of the current span. If metric is
+    given, the duration is also recorded in that histogram with the given labels.
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, _current_span.get(), metric, labels, attributes)
+
+def in_current_context(fn: Callable) -> Callable:
+    """
+    Wraps fn to run in a copy of the caller's contextvars, so spans and log_context
+    fields carry over to executor threads. Returns fn unchanged when there is neither.
+    """
+    if not _enabled and _log_context.get() is None:
+        return fn
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+def enable_instrumentation(span_exporter: Optional[Callable[[Span], None]] = None, max_spans: int = 2048):
+    """Turns tracing and metrics on. span_exporter, if given, receives every finished Span."""
+    global _enabled, _span_exporter, _finished_spans
+    _span_exporter = span_exporter
+    if _finished_spans.maxlen != max_spans:
+        _finished_spans = deque(_finished_spans, maxlen=max_spans)
+    _enabled = True
+
+def disable_instrumentation():
+    global _enabled
+    _enabled = False
+
+def instrumentation_enabled() -> bool:
+    return _enabled
+
+def prometheus_text() -> str:
+    return metrics.prometheus_text()
+
+def export_spans(clear: bool = True, service_name: str = "edumentor") -> Dict[str, Any]:
+    """Finished spans as an OTLP/JSON ExportTraceServiceRequest body."""
+    spans = list(_finished_spans)
+    if clear:
+        _finished_spans.clear()
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "project.core.observability"},
+                "spans": [finished.to_otel() for finished in spans],
+            }],
+        }]
+    }
@@ -1,11 +1,21 @@
+import asyncio
 import logging
 import os
+import time
 import uuid
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import AsyncIterator, Dict, Any, Hashable, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 # Import Core Components
 from project.core.a2a_protocol import A2AMessage, Protocol
+from project.core.message_bus import MessageBus
+from project.core import observability
+from project.core.deadline import record_overrun
+from project.core.observability import log_context, span
 from project.memory.session_memory import SessionMemory
+from project.memory.backends import SQLiteSessionBackend
+from project.memory.response_cache import ResponseCache, FRESH, STALE
 
 # Import Agents
 from project.agents.planner import Planner
@@ -14,56 +24,344 @@ from project.agents.evaluator import Evaluator
 
 from project.tools.tools import GoogleSearchTool, RealTextSummarizerTool, RealDataExtractorTool
 from project.tools.llm_tool import LLMTool
+from project.tools.llm_cache import normalize_goal
+from project.tools.rate_limit import ProviderLimiter, get_rate_limiter
+from project.tools.registry import ToolRegistry
+from project.tools.resilience import Resilience
+from project.tools.extraction_cache import ExtractionCache, DEFAULT_CACHE_PATH
 
 # Setup logger
 main_agent_logger = logging.getLogger("MainAgent")
 
+# Default runtime configuration. Any key can be overridden via MainAgent(config=...);
+# nested settings are merged key by key (see merge_config), so a partial override such as
+# {"tool_concurrency": {"search": 2}} keeps the other defaults.
+DEFAULT_CONFIG: Dict[str, Any] = {
+    # Number of Planner topics the Worker processes concurrently (1 = sequential)
+    "worker_max_workers": 4,
+    # Search results fetched per topic and pre-screened before extraction
+    "candidates_per_topic": 3,
+    # Maximum in-flight calls per tool across all topics of a Worker
+    "tool_concurrency": {
+        "search": 4,
+        "extractor": 4,
+        # Summaries are micro-batched, so allow enough callers in to fill a batch
+        "summarizer": 16,
+    },
+    # Micro-batching of Hugging Face summarization requests (batch_size=1 disables it)
+    "summarizer_batching": {
+        "batch_size": 8,
+        "batch_wait_ms": 20.0,
+    },
+    # Bounds for the in-process session store
+    "session_memory": {
+        "max_sessions": 10000,
+        "max_bytes": 64 * 1024 * 1024,
+        "idle_ttl_seconds": 60 * 60,
+    },
+    # Durable session storage (SQLite, WAL mode) behind the session store; None keeps sessions in memory only
+    "session_db_path": os.environ.get("SESSION_DB_PATH"),
+    # Memoized goal decompositions (path=None keeps them in memory only); set to None to disable
+    "llm_cache": {
+        "max_entries": 1024,
+        "ttl_seconds": 7 * 24 * 60 * 60,
+        "path": os.environ.get("LLM_CACHE_PATH"),
+    },
+    # Persistent cache of extracted page text; set to None to disable
+    "extraction_cache": {
+        "path": os.environ.get("EXTRACTION_CACHE_PATH", DEFAULT_CACHE_PATH),
+        "max_entries": 2000,
+        "max_bytes": 64 * 1024 * 1024,
+        "ttl_seconds": 24 * 60 * 60,
+    },
+    # Queue-based routing with per-agent inboxes and consumer pools, for long-lived agents
+    # serving many concurrent sessions. None routes each session inline instead. Example:
+    # {"consumers": {"Planner": 1, "Worker": 16, "Evaluator": 2}, "inbox_size": 64, "max_in_flight": 64}
+    "message_bus": None,
+    # Finished learning paths, served stale-while-revalidate; set to None to disable
+    "response_cache": {
+        "max_entries": 512,
+        "fresh_seconds": 5 * 60,
+        "max_stale_seconds": 60 * 60,
+    },
+    # Per-provider admission control (token bucket, daily quota, adaptive concurrency),
+    # shared by all agents in the process. Settings override DEFAULT_RATE_LIMITS, e.g.
+    # {"google_cse": {"daily_quota": 10000}}; a provider set to None is not limited.
+    "rate_limits": {"google_cse": {}, "gemini": {}, "huggingface": {}},
+    # Circuit breakers (per provider, and per host for the extractor), jittered retries of
+    # idempotent GETs, and hedged GETs fired after the p95 latency of recent calls (for at
+    # most hedge_budget, default 5%, of calls, and only on idle hedge threads). A tool
+    # set to None calls its dependency directly. Summarizer POSTs are never retried.
+    "resilience": {
+        "search": {"retries": 1, "hedge": False},
+        "extractor": {"retries": 1, "hedge": True},
+        "summarizer": {},
+        "breaker": {"failure_threshold": 5, "reset_timeout": 30.0},
+    },
+    # Skip resources already used by another topic of the session: same canonical URL, or
+    # extracted text whose SimHash agrees on at least `similarity` of its bits (texts under
+    # min_text_chars are not compared). Checked before summarization; None disables it.
+    "dedup": {"similarity": 0.9, "min_text_chars": 500},
+    # Per-session latency budget. Its deadline rides on every A2A message; agents and tools
+    # check it and degrade (cached or metadata-only resources, skipped topics, results
+    # flagged "partial") instead of running late. min_seconds is the time a stage needs
+    # left to run normally. None disables the budget.
+    "session_budget": {
+        "seconds": 30.0,
+        "min_seconds": {"llm": 3.0, "extractor": 3.0, "summarizer": 2.0},
+    },
+    # Process-wide tracing and metrics (see project.core.observability)
+    "instrumentation": os.environ.get("EDUMENTOR_INSTRUMENTATION") == "1",
+}
+
+def merge_config(base: Dict[str, Any], overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    base updated with overrides, merging dict values recursively. Any other value,
+    including None (which disables a feature), replaces the base value outright.
+    """
+    merged = {key: merge_config(value, None) if isinstance(value, dict) else value for key, value in base.items()}
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
 class MainAgent:
     """
     The central router that orchestrates the flow of messages between specialized agents.
     """
-    def __init__(self):
+    def __init__(self, config: Optional[Dict[str, Any]] = None, response_cache: Optional[ResponseCache] = None):
         main_agent_logger.info("MainAgent initialized all components.")
         self.logger = main_agent_logger
+        self.config: Dict[str, Any] = merge_config(DEFAULT_CONFIG, config)
+        if self.config["instrumentation"] and not observability.instrumentation_enabled():
+            observability.enable_instrumentation()
 
         # In MainAgent.__init__
         google_api_key: Optional[str] = os.environ.get("GOOGLE_API_KEY")
         google_cx_id: Optional[str] = os.environ.get("GOOGLE_CX_ID")
+        google_cse_api_url: Optional[str] = os.environ.get("GOOGLE_CSE_API_URL")
         huggingface_api_key: Optional[str] = os.environ.get("HUGGINGFACE_API_KEY")
+        huggingface_api_url: Optional[str] = os.environ.get("HUGGINGFACE_API_URL")
 
         # 1. Initialize Memory
-        self.memory = SessionMemory()
-
-        # 2. Initialize Tools
-        self.tools = {
-            "search": GoogleSearchTool(google_api_key, google_cx_id),
-            "summarizer": RealTextSummarizerTool(huggingface_api_key),
-            "llm": LLMTool(google_api_key),
-            "extractor": RealDataExtractorTool() # Add the extractor tool here
-        }
+        session_backend = SQLiteSessionBackend(self.config["session_db_path"]) if self.config["session_db_path"] else None
+        self.memory = SessionMemory(backend=session_backend, **self.config["session_memory"])
+
+        # 2. Register Tools (each is built on first use)
+        self.tools = ToolRegistry({
+            "search": lambda: GoogleSearchTool(
+                google_api_key,
+                google_cx_id,
+                api_url=google_cse_api_url,
+                rate_limiter=self._rate_limiter("google_cse"),
+                resilience=self._resilience("search")
+            ),
+            "summarizer": lambda: RealTextSummarizerTool(
+                huggingface_api_key,
+                api_url=huggingface_api_url,
+                rate_limiter=self._rate_limiter("huggingface"),
+                resilience=self._resilience("summarizer"),
+                **self.config["summarizer_batching"]
+            ),
+            "llm": lambda: LLMTool(
+                google_api_key,
+                cache_config=self.config["llm_cache"],
+                rate_limiter=self._rate_limiter("gemini"),
+                min_budget_seconds=self._min_budget("llm")
+            ),
+            "extractor": lambda: RealDataExtractorTool(
+                cache=self._build_extraction_cache(),
+                resilience=self._resilience("extractor")
+            )
+        })
         self.logger.info(f"MainAgent initialized with tools: {list(self.tools.keys())}") # ADDED LOGGING
 
         # 3. Initialize Agents
+        evaluator = Evaluator()
         self.agents = {
             "Planner": Planner(self.memory, self.tools['llm']),
-            "Worker": Worker(self.tools),
-            "Evaluator": Evaluator(),
+            "Worker": Worker(
+                self.tools,
+                max_workers=self.config["worker_max_workers"],
+                tool_limits=self.config["tool_concurrency"],
+                screener=evaluator,
+                candidates_per_topic=self.config["candidates_per_topic"],
+                min_budgets={stage: self._min_budget(stage) for stage in ("extractor", "summarizer")},
+                dedup=self.config.get("dedup")
+            ),
+            "Evaluator": evaluator,
         }
 
         self.agent_map = {name: agent for name, agent in self.agents.items()}
         self.agent_map['MainAgent'] = self
 
+        # 4. Optional message bus (consumer threads start on the first submitted session)
+        bus_config = self.config.get("message_bus")
+        self.bus: Optional[MessageBus] = MessageBus(self.agents, **bus_config) if bus_config else None
+
+        # 5. End-to-end cache of finished learning paths
+        response_cache_config = self.config.get("response_cache")
+        if response_cache_config and response_cache is None:
+            response_cache = ResponseCache(**response_cache_config)
+        self.response_cache: Optional[ResponseCache] = response_cache if response_cache_config else None
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+
+    def _rate_limiter(self, provider: str) -> Optional[ProviderLimiter]:
+        """The process-wide limiter for provider, or None if rate limiting is off for it."""
+        settings = (self.config.get("rate_limits") or {}).get(provider)
+        return get_rate_limiter(provider, settings) if settings is not None else None
+
+    def _resilience(self, tool_name: str) -> Optional[Resilience]:
+        """The resilience policy for a tool's HTTP calls, or None if it is not configured."""
+        config = self.config.get("resilience") or {}
+        if config.get(tool_name) is None:
+            return None
+        return Resilience(tool_name, breaker=config.get("breaker"), **config[tool_name])
+
+    def _min_budget(self, stage: str) -> float:
+        """Seconds a stage needs before the session deadline to run rather than degrade."""
+        budget = self.config.get("session_budget") or {}
+        return float((budget.get("min_seconds") or {}).get(stage, 0.0))
+
+    def _new_deadline(self) -> Optional[float]:
+        """The deadline for a session starting now, or None without a session budget."""
+        seconds = (self.config.get("session_budget") or {}).get("seconds")
+        return time.time() + seconds if seconds else None
+
+    def _build_extraction_cache(self) -> Optional[ExtractionCache]:
+        cache_config = self.config.get("extraction_cache")
+        if not cache_config:
+            return None
+        try:
+            return ExtractionCache(**cache_config)
+        except Exception as e:
+            self.logger.error(f"Could not open extraction cache: {e}. Continuing without it.")
+            return None
+
+    def close(self):
+        """Stops the message bus consumers, if any."""
+        if self.bus:
+            self.bus.stop()
+
+    def _response_cache_key(self, user_input: str, skill_level: Optional[str] = None) -> Hashable:
+        # The Planner does not personalize paths yet; the skill level joins the key once it does
+        return (normalize_goal(user_input), skill_level)
+
+    @staticmethod
+    def _is_cacheable(result: Optional[Dict[str, Any]]) -> bool:
+        # Partial paths (cut short by the session deadline) are not worth serving again
+        return bool(result) and "error" not in result and bool(result.get("validated_path")) and not result.get("partial")
+
+    @staticmethod
+    def _for_request(cached: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        # The cached path may have been produced for a differently spelled goal
+        cached["main_goal"] = user_input
+        return cached
+
+    def _get_refresh_executor(self) -> ThreadPoolExecutor:
+        if self._refresh_executor is None:
+            self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="response-refresh")
+        return self._refresh_executor
+
+    def _refresh(self, key: Hashable, user_input: str):
+        """Background revalidation of a stale entry."""
+        try:
+            result = self._route(user_input)
+            if self._is_cacheable(result):
+                self.response_cache.put(key, result)
+        except Exception as e:
+            self.logger.error(f"Background refresh for '{user_input}' failed: {e}. Keeping the stale entry.")
+        finally:
+            self.response_cache.end_refresh(key)
+
+    def _cache_lookup(self, key: Hashable, user_input: str) -> Optional[Dict[str, Any]]:
+        """Returns a cached learning path, scheduling a background refresh when it is stale."""
+        cached, state = self.response_cache.lookup(key)
+        if state == STALE and self.response_cache.begin_refresh(key):
+            self.logger.info(f"Serving stale learning path for '{user_input}' while it is refreshed.")
+            # A thread rather than a task: it must outlive loops torn down by asyncio.run()
+            self._get_refresh_executor().submit(self._refresh, key, user_input)
+        if state in (FRESH, STALE):
+            return self._for_request(cached, user_input)
+        return None
+
     def handle_message(self, user_input: str) -> Dict[str, Any]:
+        if self.response_cache is None:
+            return self._route(user_input)
+
+        key = self._response_cache_key(user_input)
+        cached = self._cache_lookup(key, user_input)
+        if cached is not None:
+            return cached
+
+        result = self._route(user_input)
+        if self._is_cacheable(result):
+            self.response_cache.put(key, result)
+        return result
+
+    async def ahandle_message(self, user_input: str) -> Dict[str, Any]:
+        """
+        Async variant of handle_message. Every agent hop is awaited, so many sessions
+        can share one event loop while they wait on the LLM and network tools.
+        """
+        if self.response_cache is None:
+            return await self._aroute(user_input)
+
+        key = self._response_cache_key(user_input)
+        cached = self._cache_lookup(key, user_input)
+        if cached is not None:
+            return cached
+
+        result = await self._aroute(user_input)
+        if self._is_cacheable(result):
+            self.response_cache.put(key, result)
+        return result
+
+    def _route(self, user_input: str) -> Dict[str, Any]:
+        """Runs one full Planner -> Worker -> Evaluator -> Planner session."""
         session_id = str(uuid.uuid4())
-        self.logger.info(f"Starting new session {session_id} for input: '{user_input}'")
+        self.logger.info("Starting new session %s for input: '%s'", session_id, user_input)
 
         current_message = Protocol.create_message(
             "MainAgent",
             "Planner",
             {"user_input": user_input},
-            session_id
+            session_id,
+            deadline=self._new_deadline()
+        )
+
+        with span("session", metric=observability.SESSION_SECONDS, session_id=session_id) as session_span, \
+                log_context(session_id=session_id):
+            if self.bus:
+                final_output = self.bus.request(current_message)
+            else:
+                final_output = self._route_hops(current_message)
+            self._record_session(session_span, final_output)
+        return final_output
+
+    @staticmethod
+    def _hop_span(message: A2AMessage):
+        """Span for one A2A hop, timed into the per-agent hop histogram."""
+        return span(
+            f"hop {message.recipient}",
+            metric=observability.HOP_SECONDS,
+            labels={"agent": message.recipient},
+            sender=message.sender,
+            recipient=message.recipient,
+            task_id=message.task_id
         )
 
+    @staticmethod
+    def _record_session(session_span, result: Optional[Dict[str, Any]]):
+        status = "error" if not result or "error" in result else "ok"
+        session_span.set_attribute("status", status)
+        if result and result.get("partial"):
+            session_span.set_attribute("partial", True)
+        observability.inc(observability.SESSIONS, status=status)
+
+    def _route_hops(self, current_message: A2AMessage) -> Dict[str, Any]:
         final_output = None
         step = 0
 
@@ -72,14 +370,17 @@ class MainAgent:
             sender = current_message.sender
             recipient = current_message.recipient
 
-            self.logger.info(f"\n[STEP {step}] Routing message: {sender} -> {recipient}")
+            self.logger.info("\n[STEP %d] Routing message: %s -> %s", step, sender, recipient)
 
             if recipient not in self.agent_map:
                 self.logger.error(f"Unknown recipient: {recipient}")
+                observability.inc(observability.ERRORS, component="router")
                 return {"error": f"Unknown agent recipient: {recipient}"}
 
             recipient_agent = self.agent_map[recipient]
-            reply_message = recipient_agent.handle_message(current_message)
+            with self._hop_span(current_message), log_context(task_id=current_message.task_id):
+                reply_message = recipient_agent.handle_message(current_message)
+            record_overrun(recipient, current_message.deadline)
 
             if reply_message.recipient == "MainAgent":
                 final_output = reply_message.content
@@ -88,11 +389,260 @@ class MainAgent:
 
         return final_output
 
-def run_agent(user_input: str) -> Dict[str, Any]:
-    import os
-    import uuid
-    from project.tools.tools import GoogleSearchTool, RealTextSummarizerTool, RealDataExtractorTool
-    from project.tools.llm_tool import LLMTool
+    async def _aroute(self, user_input: str) -> Dict[str, Any]:
+        """Async variant of _route."""
+        session_id = str(uuid.uuid4())
+        self.logger.info("Starting new session %s for input: '%s'", session_id, user_input)
 
-    agent = MainAgent()
+        current_message = Protocol.create_message(
+            "MainAgent",
+            "Planner",
+            {"user_input": user_input},
+            session_id,
+            deadline=self._new_deadline()
+        )
+
+        with span("session", metric=observability.SESSION_SECONDS, session_id=session_id) as session_span, \
+                log_context(session_id=session_id):
+            if self.bus:
+                # Admission may block under backpressure, so keep it off the event loop
+                future = await asyncio.to_thread(self.bus.submit, current_message)
+                final_output = await asyncio.wrap_future(future)
+            else:
+                final_output = await self._aroute_hops(current_message)
+            self._record_session(session_span, final_output)
+        return final_output
+
+    async def _aroute_hops(self, current_message: A2AMessage) -> Dict[str, Any]:
+        final_output = None
+        step = 0
+
+        while current_message.recipient != "MainAgent" or final_output is None:
+            step += 1
+            sender = current_message.sender
+            recipient = current_message.recipient
+
+            self.logger.info("\n[STEP %d] Routing message: %s -> %s", step, sender, recipient)
+
+            if recipient not in self.agents:
+                self.logger.error(f"Unknown recipient: {recipient}")
+                observability.inc(observability.ERRORS, component="router")
+                return {"error": f"Unknown agent recipient: {recipient}"}
+
+            with self._hop_span(current_message), log_context(task_id=current_message.task_id):
+                reply_message = await self.agents[recipient].ahandle_message(current_message)
+            record_overrun(recipient, current_message.deadline)
+
+            if reply_message.recipient == "MainAgent":
+                final_output = reply_message.content
+
+            current_message = reply_message
+
+        return final_output
+
+    def run_batch(
+        self,
+        goals: Iterable[Union[str, Dict[str, Any]]],
+        output: Union[str, TextIO],
+        max_parallel: int = 8,
+        window_size: int = 64,
+        resume: bool = True,
+        dedup_across_batch: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Generates learning paths for many goals, sharing decomposition and per-topic work
+        across the batch, and appends them to output as JSONL. See project.batch.BatchRunner.
+        """
+        # Imported here: project.batch builds on this module
+        from project.batch import BatchRunner
+        runner = BatchRunner(self, max_parallel=max_parallel, window_size=window_size, dedup_across_batch=dedup_across_batch)
+        return runner.run(goals, output, resume=resume)
+
+    # --- Streaming API ---
+    # Events are dicts with an "event" key:
+    #   {"event": "topics", "topics": [...], "session_id": ...}       once, after decomposition
+    #   {"event": "resource", "index": i, "resource": {...}}          per validated resource, as soon as it is scored
+    #   {"event": "skipped", "index": i}                              per topic without a passing resource
+    #   {"event": "done", "result": {"main_goal": ..., "validated_path": [...]}}
+    # "index" is the topic's position in the decomposition; the final result keeps that order,
+    # and carries "partial": True when the session budget cut topics short.
+    # Cached results are replayed as the same events with "cached": True.
+
+    @staticmethod
+    def _cached_events(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        path = result["validated_path"]
+        events: List[Dict[str, Any]] = [{
+            "event": "topics",
+            "topics": [{"topic": resource.get("topic"), "type": resource.get("type")} for resource in path],
+            "cached": True,
+        }]
+        events.extend({"event": "resource", "index": index, "resource": resource} for index, resource in enumerate(path))
+        events.append({"event": "done", "result": result, "cached": True})
+        return events
+
+    def _start_stream(self, user_input: str) -> Tuple[Optional[Hashable], Optional[Dict[str, Any]], A2AMessage]:
+        key = cached = None
+        if self.response_cache is not None:
+            key = self._response_cache_key(user_input)
+            cached = self._cache_lookup(key, user_input)
+        session_id = str(uuid.uuid4())
+        self.logger.info("Starting new streamed session %s for input: '%s'", session_id, user_input)
+        message = Protocol.create_message(
+            "MainAgent", "Planner", {"user_input": user_input}, session_id, deadline=self._new_deadline()
+        )
+        return key, cached, message
+
+    def _assemble_message(self, message: A2AMessage, validated: Dict[int, Dict[str, Any]], partial: bool) -> A2AMessage:
+        return Protocol.create_message(
+            "Evaluator",
+            "Planner",
+            {"validated_resources": [validated[index] for index in sorted(validated)], "partial": partial},
+            message.session_id,
+            deadline=message.deadline,
+            trusted=True
+        )
+
+    def _finish_stream(self, key: Optional[Hashable], result: Dict[str, Any], started: float) -> Dict[str, Any]:
+        if key is not None and self._is_cacheable(result):
+            self.response_cache.put(key, result)
+        # A span cannot stay open across yields to the consumer, so streamed sessions
+        # only feed the session metrics; their hops and tool calls are still traced.
+        observability.observe(observability.SESSION_SECONDS, time.perf_counter() - started)
+        observability.inc(observability.SESSIONS, status="ok" if self._is_cacheable(result) else "error")
+        return {"event": "done", "result": result}
+
+    def stream(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        """
+        Runs the pipeline like handle_message, yielding events as they happen: resources
+        are scored one by one as their topic completes instead of in one batch at the end.
+
+        With a message bus the session takes one of its max_in_flight slots (waiting for
+        one if needed) until the generator finishes or is closed, though its agents run
+        in the consumer's thread rather than on the bus consumers.
+        """
+        key, cached, message = self._start_stream(user_input)
+        if cached is not None:
+            yield from self._cached_events(cached)
+            return
+
+        release = self.bus.admit() if self.bus else None
+        try:
+            yield from self._stream_session(key, message)
+        finally:
+            if release:
+                release()
+
+    def _stream_session(self, key: Optional[Hashable], message: A2AMessage) -> Iterator[Dict[str, Any]]:
+        started = time.perf_counter()
+        planner, worker, evaluator = self.agents["Planner"], self.agents["Worker"], self.agents["Evaluator"]
+        with self._hop_span(message), log_context(session_id=message.session_id, task_id=message.task_id):
+            reply = planner.handle_message(message)
+        if reply.recipient == "MainAgent":
+            yield {"event": "done", "result": reply.content}
+            return
+
+        topics = reply.content["topics"]
+        yield {"event": "topics", "topics": topics, "session_id": message.session_id}
+
+        validated: Dict[int, Dict[str, Any]] = {}
+        results: List[Optional[Dict[str, Any]]] = []
+        for index, resource in worker.iter_topics(topics, message.deadline):
+            results.append(resource)
+            if resource and evaluator.evaluate(resource):
+                validated[index] = resource
+                yield {"event": "resource", "index": index, "resource": resource}
+            else:
+                yield {"event": "skipped", "index": index}
+
+        assembly = self._assemble_message(message, validated, worker.is_partial(results, message.deadline))
+        with self._hop_span(assembly), log_context(session_id=assembly.session_id, task_id=assembly.task_id):
+            final = planner.handle_message(assembly)
+        yield self._finish_stream(key, final.content, started)
+
+    async def astream(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of stream."""
+        key, cached, message = self._start_stream(user_input)
+        if cached is not None:
+            for event in self._cached_events(cached):
+                yield event
+            return
+
+        # Admission may block under backpressure, so keep it off the event loop
+        release = await asyncio.to_thread(self.bus.admit) if self.bus else None
+        session = self._astream_session(key, message)
+        try:
+            async for event in session:
+                yield event
+        finally:
+            # Unlike yield from, async for does not close the inner generator when this one is closed
+            await session.aclose()
+            if release:
+                release()
+
+    async def _astream_session(self, key: Optional[Hashable], message: A2AMessage) -> AsyncIterator[Dict[str, Any]]:
+        started = time.perf_counter()
+        planner, worker, evaluator = self.agents["Planner"], self.agents["Worker"], self.agents["Evaluator"]
+        with self._hop_span(message), log_context(session_id=message.session_id, task_id=message.task_id):
+            reply = await planner.ahandle_message(message)
+        if reply.recipient == "MainAgent":
+            yield {"event": "done", "result": reply.content}
+            return
+
+        topics = reply.content["topics"]
+        yield {"event": "topics", "topics": topics, "session_id": message.session_id}
+
+        validated: Dict[int, Dict[str, Any]] = {}
+        results: List[Optional[Dict[str, Any]]] = []
+        async for index, resource in worker.aiter_topics(topics, message.deadline):
+            results.append(resource)
+            if resource and evaluator.evaluate(resource):
+                validated[index] = resource
+                yield {"event": "resource", "index": index, "resource": resource}
+            else:
+                yield {"event": "skipped", "index": index}
+
+        assembly = self._assemble_message(message, validated, worker.is_partial(results, message.deadline))
+        with self._hop_span(assembly), log_context(session_id=assembly.session_id, task_id=assembly.task_id):
+            final = await planner.ahandle_message(assembly)
+        yield self._finish_stream(key, final.content, started)
+
+_shared_response_cache: Optional[ResponseCache] = None
+_shared_response_cache_lock = threading.Lock()
+
+def get_shared_response_cache(config: Optional[Dict[str, Any]] = None) -> Optional[ResponseCache]:
+    """
+    The process-wide response cache used by run_agent/arun_agent, which build a fresh
+    MainAgent per call. Created from the first config that enables it.
+    """
+    global _shared_response_cache
+    cache_config = merge_config(DEFAULT_CONFIG, config).get("response_cache")
+    if not cache_config:
+        return None
+    with _shared_response_cache_lock:
+        if _shared_response_cache is None:
+            _shared_response_cache = ResponseCache(**cache_config)
+        return _shared_response_cache
+
+async def arun_agent(user_input: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    if config is None:
+        # Imported here: project.runtime builds on this module
+        from project.runtime import get_runtime
+        return await get_runtime().ahandle(user_input)
+    agent = MainAgent(config, response_cache=get_shared_response_cache(config))
+    return await agent.ahandle_message(user_input)
+
+def run_agent(user_input: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Synchronous entry point. Without a config, requests are served by the warm
+    process-wide runtime; an explicit config gets a dedicated, short-lived MainAgent.
+
+    This uses the sync pipeline rather than asyncio.run(arun_agent(...)): the runtime
+    outlives any one event loop, and its async clients (e.g. Gemini's client.aio) must
+    not be reused after the loop they were bound to is closed.
+    """
+    if config is None:
+        # Imported here: project.runtime builds on this module
+        from project.runtime import get_runtime
+        return get_runtime().handle(user_input)
+    agent = MainAgent(config, response_cache=get_shared_response_cache(config))
     return agent.handle_message(user_input)
@@ -0,0 +1,208 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+backend_logger = logging.getLogger("SessionBackend")
+
+class SessionBackend:
+    """Interface for durable session storage behind SessionMemory."""
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def load_recent(self, limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """Most recently updated sessions first; used to warm the cache after a restart."""
+        raise NotImplementedError
+
+    def write_batch(self, items: List[Tuple[str, Optional[Dict[str, Any]]]]):
+        """Persists (session_id, data) pairs in one transaction; data=None deletes the session."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Session storage in a SQLite database in WAL mode, so several worker processes can
+    share one file and readers never block the writer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at)")
+        self._conn.commit()
+        backend_logger.info(f"SQLiteSessionBackend opened at {path}.")
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_recent(self, limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, data FROM sessions ORDER BY updated_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [(session_id, json.loads(data)) for session_id, data in rows]
+
+    def write_batch(self, items: List[Tuple[str, Optional[Dict[str, Any]]]]):
+        now = time.time()
+        upserts = [(session_id, json.dumps(data, default=str), now) for session_id, data in items if data is not None]
+        deletes = [(session_id,) for session_id, data in items if data is None]
+        with self._lock:
+            with self._conn:
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)", upserts
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM sessions WHERE session_id = ?", deletes)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Writers still holding unflushed data when the interpreter exits
+_live_writers: "weakref.WeakSet[WriteBehindWriter]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_live_writers():
+    for writer in list(_live_writers):
+        writer.close()
+
+class WriteBehindWriter:
+    """
+    Buffers session writes and persists them from a background thread, keeping the
+    backend off the request path. Repeated writes to one session between flushes are
+    coalesced into a single row. A flush happens every flush_interval seconds or as soon
+    as max_batch sessions are dirty.
+    """
+
+    def __init__(self, backend: SessionBackend, flush_interval: float = 0.5, max_batch: int = 500):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._cond = threading.Condition()
+        self._dirty: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._flushing: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._closed = False
+
+        self.enqueued = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.rows_written = 0
+        self.flush_seconds = 0.0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="session-write-behind", daemon=True)
+        self._thread.start()
+        _live_writers.add(self)
+
+    def enqueue(self, session_id: str, data: Optional[Dict[str, Any]]):
+        with self._cond:
+            if session_id in self._dirty:
+                self.coalesced += 1
+            self._dirty[session_id] = data
+            self.enqueued += 1
+            if len(self._dirty) >= self.max_batch:
+                self._cond.notify()
+
+    def pending(self, session_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Returns (True, data) if a write for session_id has not reached the backend yet."""
+        with self._cond:
+            for buffer in (self._dirty, self._flushing):
+                if session_id in buffer:
+                    return True, buffer[session_id]
+        return False, None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._dirty) < self.max_batch:
+                    self._cond.wait(timeout=self.flush_interval)
+                closed = self._closed
+            self._flush_once()
+            if closed:
+                return
+
+    def _flush_once(self):
+        with self._cond:
+            if not self._dirty:
+                return
+            # Keep the batch visible to pending() until it is durable
+            self._flushing, self._dirty = self._dirty, {}
+            batch = list(self._flushing.items())
+
+        start = time.perf_counter()
+        try:
+            self.backend.write_batch(batch)
+        except Exception as e:
+            backend_logger.error(f"Write-behind flush of {len(batch)} sessions failed: {e}. Will retry.")
+            with self._cond:
+                self.errors += 1
+                # Newer writes that arrived meanwhile take precedence over the failed batch
+                self._dirty = {**self._flushing, **self._dirty}
+                self._flushing = {}
+            return
+
+        with self._cond:
+            self._flushing = {}
+            self.batches += 1
+            self.rows_written += len(batch)
+            self.flush_seconds += time.perf_counter() - start
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 10.0):
+        """Blocks until everything enqueued so far has been written."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify()
+        while time.monotonic() < deadline:
+            with self._cond:
+                if not self._dirty and not self._flushing:
+                    return
+                if self._dirty and not self._flushing:
+                    self._cond.notify()
+                self._cond.wait(timeout=0.01)
+        backend_logger.warning("Write-behind flush timed out; some session writes are still pending.")
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        _live_writers.discard(self)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "pending": len(self._dirty) + len(self._flushing),
+                "batches": self.batches,
+                "rows_written": self.rows_written,
+                "avg_batch_size": round(self.rows_written / self.batches, 2) if self.batches else 0.0,
+                "flush_seconds": round(self.flush_seconds, 4),
+                "errors": self.errors,
+            }
@@ -0,0 +1,100 @@
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from project.core import observability
+
+response_cache_logger = logging.getLogger("ResponseCache")
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+class ResponseCache:
+    """
+    Bounded LRU cache of final learning paths with stale-while-revalidate semantics.
+    An entry younger than fresh_seconds is served as is. Up to max_stale_seconds old it is
+    still served immediately, but flagged STALE so the caller refreshes it in the
+    background; begin_refresh() ensures only one refresh per key runs at a time.
+    Older entries are treated as misses.
+    """
+
+    def __init__(self, max_entries: int = 512, fresh_seconds: float = 5 * 60, max_stale_seconds: float = 60 * 60):
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+
+        self._lock = threading.Lock()
+        # key -> (stored_at, value); ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._refreshing: Set[Hashable] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Returns (a copy of the cached value or None, FRESH | STALE | MISS)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry[0] if entry else None
+            if entry is None or age > self.max_stale_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                observability.inc(observability.CACHE_LOOKUPS, cache="response", result=MISS)
+                return None, MISS
+
+            self._entries.move_to_end(key)
+            if age <= self.fresh_seconds:
+                self.hits += 1
+                state = FRESH
+            else:
+                self.stale_hits += 1
+                state = STALE
+            value = entry[1]
+
+        observability.inc(observability.CACHE_LOOKUPS, cache="response", result=state)
+        return copy.deepcopy(value), state
+
+    def put(self, key: Hashable, value: Dict[str, Any]):
+        stored = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.time(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def begin_refresh(self, key: Hashable) -> bool:
+        """Claims the background refresh of key; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def end_refresh(self, key: Hashable):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                # Stale hits are answered from cache too
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            }
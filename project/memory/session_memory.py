@@ -1,26 +1,252 @@
 import logging
-from typing import Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from project.memory.backends import SessionBackend, WriteBehindWriter
 
 memory_logger = logging.getLogger("SessionMemory")
 
+def _estimate_size(value: Any) -> int:
+    """Cheap approximation of the memory held by a JSON-like value, in bytes."""
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_estimate_size(item) for item in value)
+    if isinstance(value, str):
+        return 49 + len(value)
+    return 32
+
+class _Shard:
+    """One lock-protected LRU segment of the store."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # session_id -> [data, last_access, size]; ordered from least to most recently used
+        self.entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+
 class SessionMemory:
     """
     Simulated memory store for tracking session state and user skill progression.
+
+    Bounded and thread-safe: sessions are spread over independently locked shards, each an
+    LRU. A session idle for longer than idle_ttl_seconds is dropped, and the least recently
+    used sessions (across all shards) are evicted once the store holds more than
+    max_sessions sessions or max_bytes (estimated) of data. The bounds are checked after
+    each write, so concurrent writers may overshoot them briefly.
+
+    The `sessions` property of the former dict-backed store is kept as a read-only
+    snapshot; mutating it does not change the store.
+
+    With a backend, the store becomes a read-through cache over durable storage: misses
+    are loaded from the backend, and writes are persisted asynchronously by a
+    WriteBehindWriter, so evicted or restarted sessions can be recovered.
     """
-    def __init__(self):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_ttl_seconds: float = 60 * 60,
+        num_shards: int = 16,
+        backend: Optional[SessionBackend] = None,
+        flush_interval: float = 0.5,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._shards = [_Shard() for _ in range(max(1, num_shards))]
+        # Store-wide totals, adjusted under the shard lock of each change
+        self._totals_lock = threading.Lock()
+        self._sessions = 0
+        self._bytes = 0
+
+        self._stats_lock = threading.Lock()
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+        self.backend_loads = 0
+
+        self.backend = backend
+        self.writer = WriteBehindWriter(backend, flush_interval=flush_interval) if backend else None
         memory_logger.info("SessionMemory initialized.")
 
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    @property
+    def sessions(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of the cached sessions (not those only in the backend), by session ID."""
+        snapshot = {}
+        for shard in self._shards:
+            with shard.lock:
+                snapshot.update((session_id, dict(entry[0])) for session_id, entry in shard.entries.items())
+        return snapshot
+
+    def _evict(self, shard: _Shard, now: float):
+        """Drops the shard's idle sessions. Caller holds shard.lock."""
+        idle = freed = 0
+        while shard.entries:
+            entry = next(iter(shard.entries.values()))
+            if now - entry[1] <= self.idle_ttl_seconds:
+                break
+            shard.entries.popitem(last=False)
+            idle += 1
+            freed += entry[2]
+
+        if idle:
+            self._resize(-idle, -freed)
+            with self._stats_lock:
+                self.evicted_idle += idle
+
+    def _resize(self, sessions: int, size: int):
+        with self._totals_lock:
+            self._sessions += sessions
+            self._bytes += size
+
+    def _over_capacity(self) -> bool:
+        # Unlocked reads: a stale total only delays or repeats the check
+        return self._sessions > self.max_sessions or self._bytes > self.max_bytes
+
+    def _enforce_bounds(self):
+        """
+        Evicts the least recently used sessions across shards until the totals are within
+        bounds. Takes one shard lock at a time, so callers must not hold any.
+        """
+        evicted = 0
+        while self._over_capacity():
+            victim, oldest = None, None
+            for shard in self._shards:
+                with shard.lock:
+                    if shard.entries:
+                        last_access = next(iter(shard.entries.values()))[1]
+                        if oldest is None or last_access < oldest:
+                            victim, oldest = shard, last_access
+            if victim is None:
+                break
+            with victim.lock:
+                if not victim.entries:
+                    continue
+                _, entry = victim.entries.popitem(last=False)
+                self._resize(-1, -entry[2])
+            evicted += 1
+
+        if evicted:
+            with self._stats_lock:
+                self.evicted_capacity += evicted
+
+    def _load_into(self, shard: _Shard, session_id: str, now: float) -> Optional[List[Any]]:
+        """Read-through: loads a session from unflushed writes or the backend into the shard. Caller holds shard.lock."""
+        if not self.backend:
+            return None
+        is_pending, data = self.writer.pending(session_id)
+        if not is_pending:
+            data = self.backend.load(session_id)
+        if data is None:
+            return None
+
+        with self._stats_lock:
+            self.backend_loads += 1
+        size = _estimate_size(data)
+        entry = shard.entries[session_id] = [dict(data), now, size]
+        self._resize(1, size)
+        return entry
+
+    def warm(self, limit: int = 1000) -> int:
+        """Preloads the most recently updated sessions from the backend, e.g. after a restart."""
+        if not self.backend:
+            return 0
+        now = time.time()
+        loaded = 0
+        for session_id, data in self.backend.load_recent(limit):
+            shard = self._shard(session_id)
+            with shard.lock:
+                if session_id in shard.entries:
+                    continue
+                size = _estimate_size(data)
+                shard.entries[session_id] = [data, now, size]
+                shard.entries.move_to_end(session_id, last=False)
+                self._resize(1, size)
+                self._evict(shard, now)
+                loaded += 1
+        if self._over_capacity():
+            self._enforce_bounds()
+        return loaded
+
+    def flush(self):
+        """Blocks until all buffered writes have reached the backend."""
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        if self.backend:
+            self.backend.close()
+
     def get_session(self, session_id: str) -> Dict[str, Any]:
         """Retrieves data for a specific session ID."""
-        return self.sessions.get(session_id, {})
+        shard = self._shard(session_id)
+        now = time.time()
+        with shard.lock:
+            entry = shard.entries.get(session_id)
+            if entry is not None and now - entry[1] > self.idle_ttl_seconds:
+                self._evict(shard, now)
+                entry = None
+            loaded = entry is None
+            if loaded:
+                entry = self._load_into(shard, session_id, now)
+                if entry is None:
+                    return {}
+            entry[1] = now
+            shard.entries.move_to_end(session_id)
+            # A copy, so callers never mutate shared state outside the lock
+            data = dict(entry[0])
+        if loaded and self._over_capacity():
+            self._enforce_bounds()
+        return data
 
     def update_session(self, session_id: str, data: Dict[str, Any]):
         """Updates or creates data for a session."""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {}
-        self.sessions[session_id].update(data)
-        memory_logger.debug(f"Session {session_id} updated.")
+        shard = self._shard(session_id)
+        now = time.time()
+        with shard.lock:
+            entry = shard.entries.get(session_id)
+            created = 0
+            if entry is None:
+                # Merge into the durable copy, if any, rather than overwriting it
+                entry = self._load_into(shard, session_id, now)
+                if entry is None:
+                    entry = shard.entries[session_id] = [{}, now, 0]
+                    created = 1
+            entry[0].update(data)
+            entry[1] = now
+            size = _estimate_size(entry[0])
+            if created or size != entry[2]:
+                self._resize(created, size - entry[2])
+            entry[2] = size
+            shard.entries.move_to_end(session_id)
+            if self.writer:
+                self.writer.enqueue(session_id, dict(entry[0]))
+            self._evict(shard, now)
+        if self._over_capacity():
+            self._enforce_bounds()
+        memory_logger.debug("Session %s updated.", session_id)
+
+    def delete_session(self, session_id: str):
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.pop(session_id, None)
+            if entry is not None:
+                self._resize(-1, -entry[2])
+            if self.writer:
+                self.writer.enqueue(session_id, None)
+
+    def purge_idle(self):
+        """Sweeps every shard for idle sessions (eviction otherwise happens lazily on access)."""
+        now = time.time()
+        for shard in self._shards:
+            with shard.lock:
+                self._evict(shard, now)
 
     def update_user_skill(self, session_id: str, new_skill_level: str):
         """
@@ -31,3 +257,21 @@ class SessionMemory:
         # so the Planner can call it without crashing.
         self.update_session(session_id, {"skill_level": new_skill_level})
         memory_logger.info(f"Updated memory for user {session_id}. New skill: {new_skill_level}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and eviction counters for monitoring."""
+        with self._totals_lock:
+            sessions, total_bytes = self._sessions, self._bytes
+        with self._stats_lock:
+            stats = {
+                "sessions": sessions,
+                "bytes": total_bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "evicted_idle": self.evicted_idle,
+                "evicted_capacity": self.evicted_capacity,
+                "backend_loads": self.backend_loads,
+            }
+        if self.writer:
+            stats["write_behind"] = self.writer.stats()
+        return stats
@@ -9,7 +9,7 @@ if '/content' not in sys.path:
 from project.core.observability import setup_logging
 setup_logging(level=logging.INFO)
 
-from project.main_agent import run_agent
+from project.runtime import get_runtime
 
 if __name__ == "__main__":
     logging.getLogger("DEMO").info("--- Starting EduMentor Multi-Agent Demo ---")
@@ -17,11 +17,15 @@ if __name__ == "__main__":
     test_query = "Learn Python basics for data science"
     print(f"\n[DEMO INPUT]: {test_query}\n")
 
+    # Build and warm the runtime once; requests then only pay for the pipeline itself
+    runtime = get_runtime()
+
     # Run the agent system
-    result = run_agent(test_query)
+    result = runtime.handle(test_query)
 
     print("\n" + "="*50)
     print("FINAL AGENT SYSTEM OUTPUT")
     print("="*50)
     print(result)
+    print(f"\n[RUNTIME HEALTH]: {runtime.health()['status']}")
     print("\n--- Demo Complete ---")
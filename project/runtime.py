@@ -0,0 +1,207 @@
+import logging
+import sys
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from project.core import observability
+from project.core.deadline import budget_stats
+from project.main_agent import MainAgent, get_shared_response_cache
+from project.tools.rate_limit import rate_limiter_stats
+from project.tools.resilience import breaker_stats
+
+# Setup logger
+runtime_logger = logging.getLogger("AgentRuntime")
+
+class AgentRuntime:
+    """
+    A warm, process-wide MainAgent. Tools, clients, caches and connection pools are built
+    once and shared by every request, so per-request work is only the pipeline itself.
+    All components are thread-safe, so one runtime can serve concurrent requests.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, warm: bool = True):
+        self.created_at = time.time()
+        self.agent = MainAgent(config, response_cache=get_shared_response_cache(config))
+        self.requests = 0
+        self.errors = 0
+        self._stats_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._closed = False
+        self.warmup_seconds: Optional[float] = None
+        if warm:
+            self.warmup()
+
+    def _tool_mode(self, name: str, is_real) -> str:
+        tool = self.agent.tools.peek(name)
+        if tool is None:
+            return "not loaded"
+        return "real" if is_real(tool) else "mock"
+
+    def _provider_urls(self) -> List[str]:
+        """Endpoints of the real (non-mock) network tools, for connection pre-warming."""
+        tools = self.agent.tools
+        urls = []
+        if tools["search"].api_key:
+            urls.append(tools["search"].api_url)
+        if tools["summarizer"].headers:
+            urls.append(tools["summarizer"].api_url)
+        return urls
+
+    def warmup(self):
+        """Builds every tool, pre-connects to the real providers and reloads recent sessions. Safe to call again."""
+        start = time.perf_counter()
+        self.agent.tools.load_all()
+        self.agent.tools["llm"].warm_client()
+        urls = self._provider_urls()
+        if urls:
+            warmed = self.agent.tools["search"].http.prewarm(urls)
+            runtime_logger.info(f"Pre-warmed connections to {warmed}/{len(urls)} provider hosts.")
+        loaded = self.agent.memory.warm()
+        if loaded:
+            runtime_logger.info(f"Reloaded {loaded} recent sessions from the session backend.")
+        self.warmup_seconds = time.perf_counter() - start
+        self._ready.set()
+        runtime_logger.info(f"AgentRuntime ready after {self.warmup_seconds:.3f}s warmup.")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and not self._closed
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _count(self, failed: bool):
+        with self._stats_lock:
+            self.requests += 1
+            if failed:
+                self.errors += 1
+
+    def handle(self, user_input: str) -> Dict[str, Any]:
+        failed = True
+        try:
+            result = self.agent.handle_message(user_input)
+            failed = not result or "error" in result
+            return result
+        finally:
+            self._count(failed)
+
+    async def ahandle(self, user_input: str) -> Dict[str, Any]:
+        failed = True
+        try:
+            result = await self.agent.ahandle_message(user_input)
+            failed = not result or "error" in result
+            return result
+        finally:
+            self._count(failed)
+
+    def stream(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        """Yields pipeline events as they happen; see MainAgent.stream for the event shapes."""
+        failed = True
+        try:
+            for event in self.agent.stream(user_input):
+                if event["event"] == "done":
+                    failed = not event["result"] or "error" in event["result"]
+                yield event
+        finally:
+            self._count(failed)
+
+    async def astream(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        failed = True
+        try:
+            async for event in self.agent.astream(user_input):
+                if event["event"] == "done":
+                    failed = not event["result"] or "error" in event["result"]
+                yield event
+        finally:
+            self._count(failed)
+
+    def health(self) -> Dict[str, Any]:
+        """Liveness/readiness report: tool modes, cache and pool statistics, request counters."""
+        agent = self.agent
+        tools = agent.tools
+        report: Dict[str, Any] = {
+            "status": "ok" if self.ready else ("closed" if self._closed else "starting"),
+            "ready": self.ready,
+            "uptime_seconds": round(time.time() - self.created_at, 3),
+            "warmup_seconds": round(self.warmup_seconds, 4) if self.warmup_seconds is not None else None,
+            "tools": {
+                "search": self._tool_mode("search", lambda tool: tool.api_key),
+                "summarizer": self._tool_mode("summarizer", lambda tool: tool.headers),
+                "llm": self._tool_mode("llm", lambda tool: tool._client),
+                "extractor": self._tool_mode("extractor", lambda tool: True),
+            },
+            "session_memory": agent.memory.stats(),
+        }
+        with self._stats_lock:
+            report["requests"] = self.requests
+            report["errors"] = self.errors
+        if agent.response_cache:
+            report["response_cache"] = agent.response_cache.stats()
+        if "project.tools.http_client" in sys.modules:
+            # Only report pools once the HTTP stack has been loaded
+            from project.tools.http_client import get_http_client
+            report["http"] = get_http_client().stats()
+        llm, extractor = tools.peek("llm"), tools.peek("extractor")
+        if llm and llm.cache:
+            report["llm_cache"] = llm.cache.stats()
+        if extractor and extractor.cache:
+            report["extraction_cache"] = extractor.cache.stats()
+        if agent.bus:
+            report["message_bus"] = agent.bus.stats()
+        policies = {
+            name: tools.peek(name).resilience.stats()
+            for name in tools.loaded() if getattr(tools.peek(name), "resilience", None)
+        }
+        if policies:
+            report["resilience"] = policies
+        # Host breakers can be numerous; only those that have tripped are listed
+        breakers = breaker_stats(only_tripped=True)
+        if breakers:
+            report["circuit_breakers"] = breakers
+        limiters = rate_limiter_stats()
+        if limiters:
+            report["rate_limits"] = limiters
+        budget = budget_stats.snapshot()
+        if budget["overruns"] or budget["degradations"]:
+            report["session_budget"] = budget
+        if observability.instrumentation_enabled():
+            report["metrics"] = observability.metrics.snapshot()
+        return report
+
+    def metrics_text(self) -> str:
+        """Tracing metrics in the Prometheus text format, for a /metrics endpoint."""
+        return observability.prometheus_text()
+
+    def close(self):
+        """Stops background consumers and flushes durable state."""
+        if self._closed:
+            return
+        self._closed = True
+        self.agent.close()
+        self.agent.memory.close()
+
+_runtime: Optional[AgentRuntime] = None
+_runtime_lock = threading.Lock()
+
+def get_runtime(config: Optional[Dict[str, Any]] = None) -> AgentRuntime:
+    """
+    Returns the process-wide runtime, creating and warming it on first use. The config
+    only applies to that first call; use AgentRuntime directly for a differently
+    configured instance.
+    """
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AgentRuntime(config)
+    elif config is not None:
+        runtime_logger.debug("get_runtime(config=...) ignored: the runtime already exists.")
+    return _runtime
+
+def shutdown_runtime():
+    global _runtime
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    if runtime is not None:
+        runtime.close()
@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Setup logger
+batch_logger = logging.getLogger("MicroBatcher")
+
+class MicroBatcher:
+    """
+    Collects items submitted concurrently (from many topics, threads or sessions) and
+    hands them to batch_fn in groups. A batch is dispatched when it reaches
+    max_batch_size or when its oldest item has waited max_wait_ms, whichever comes first.
+    Items are only batched with others submitted under the same key (e.g. the same
+    generation parameters). batch_fn(items, key) must return one result per item, in order.
+    The collector thread starts on first use and exits after idle_timeout seconds without work.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any], Hashable], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        max_in_flight: int = 2,
+        idle_timeout: float = 30.0,
+        name: str = "batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.idle_timeout = idle_timeout
+        self.name = name
+
+        self._cond = threading.Condition()
+        # key -> [(item, future, enqueued_at)], each list in arrival order
+        self._pending: Dict[Hashable, List[Tuple[Any, Future, float]]] = {}
+        self._closed = False
+
+        self.batches = 0
+        self.items = 0
+        self.total_wait = 0.0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"{name}-dispatch")
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, item: Any, key: Hashable = None) -> Future:
+        """Queues an item and returns a Future resolved with its result."""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"MicroBatcher '{self.name}' is closed.")
+            self._pending.setdefault(key, []).append((item, future, time.monotonic()))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-collector", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def __call__(self, item: Any, key: Hashable = None) -> Any:
+        """Submits an item and blocks until its batch has been processed."""
+        return self.submit(item, key).result()
+
+    def _next_batch(self) -> Optional[Tuple[Hashable, List[Tuple[Any, Future, float]]]]:
+        """Blocks until a batch is due (full or timed out) and removes it from the queue."""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    if not self._closed:
+                        self._cond.wait(timeout=self.idle_timeout)
+                    if not self._pending:
+                        # Closed or idle: let the thread exit; submit() starts a new one when needed
+                        self._thread = None
+                        return None
+                    continue
+
+                # A full batch goes immediately; otherwise serve the key whose oldest item has waited longest
+                key, entries = next(
+                    ((k, e) for k, e in self._pending.items() if len(e) >= self.max_batch_size),
+                    min(self._pending.items(), key=lambda kv: kv[1][0][2])
+                )
+                remaining = entries[0][2] + self.max_wait - time.monotonic()
+                if len(entries) >= self.max_batch_size or remaining <= 0 or self._closed:
+                    batch = entries[:self.max_batch_size]
+                    del entries[:self.max_batch_size]
+                    if not entries:
+                        del self._pending[key]
+                    return key, batch
+                self._cond.wait(timeout=remaining)
+
+    def _run(self):
+        while True:
+            next_batch = self._next_batch()
+            if next_batch is None:
+                return
+            self._executor.submit(self._dispatch, *next_batch)
+
+    def _dispatch(self, key: Hashable, batch: List[Tuple[Any, Future, float]]):
+        started = time.monotonic()
+        with self._cond:
+            self.batches += 1
+            self.items += len(batch)
+            self.total_wait += sum(started - enqueued_at for _, _, enqueued_at in batch)
+
+        try:
+            results = self.batch_fn([item for item, _, _ in batch], key)
+            if len(results) != len(batch):
+                raise ValueError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            batch_logger.error(f"[{self.name}] Batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "avg_wait_ms": round(1000 * self.total_wait / self.items, 2) if self.items else 0.0,
+                "queued": sum(len(entries) for entries in self._pending.values()),
+            }
+
+    def close(self):
+        """Flushes queued items and stops the collector thread."""
+        with self._cond:
+            self._closed = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+        self._executor.shutdown(wait=True)
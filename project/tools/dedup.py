@@ -0,0 +1,156 @@
+import hashlib
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from project.core import observability
+from project.tools.url_utils import url_key
+
+FINGERPRINT_BITS = 64
+_MASK = (1 << FINGERPRINT_BITS) - 1
+_WORD = re.compile(r"\w+")
+
+
+def _shingles(text: str, size: int) -> Iterator[str]:
+    tokens = _WORD.findall(text.lower())
+    if len(tokens) <= size:
+        yield " ".join(tokens)
+        return
+    for start in range(len(tokens) - size + 1):
+        yield " ".join(tokens[start:start + size])
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    64-bit SimHash of text over its distinct word shingles: bit i is set when more than
+    half of the shingle hashes have bit i set. Near-identical texts (mirrors, pages with
+    different boilerplate) get fingerprints a few bits apart.
+
+    The per-bit vote counts are kept bit-sliced (planes[j] holds bit j of all 64 counters),
+    so adding a hash is a short ripple-carry over whole ints instead of a 64-step loop.
+    """
+    planes: List[int] = []
+    features = 0
+    for feature in set(_shingles(text, shingle_size)):
+        carry = _hash64(feature)
+        for j in range(len(planes)):
+            planes[j], carry = planes[j] ^ carry, planes[j] & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+        features += 1
+
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        votes = 0
+        for j, plane in enumerate(planes):
+            votes |= ((plane >> bit) & 1) << j
+        if 2 * votes > features:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK).count("1")
+
+
+class DuplicateIndex:
+    """
+    Resources already taken by some owner (a topic), for dropping duplicates before they
+    are summarized: exact duplicates by canonical URL, near-duplicates by the SimHash of
+    their extracted text. Texts are near-duplicates when their fingerprints agree on at
+    least `similarity` of the 64 bits.
+
+    Fingerprints are split into max_distance + 1 bands; two fingerprints within
+    max_distance bits of each other agree exactly on at least one band, so a lookup only
+    compares against entries sharing a band. Texts shorter than min_text_chars (mock or
+    error placeholders, stubs) are not fingerprinted. Thread-safe.
+    """
+
+    def __init__(self, similarity: float = 0.9, min_text_chars: int = 500, shingle_size: int = 3):
+        if not 0.5 <= similarity <= 1.0:
+            raise ValueError("similarity must be between 0.5 and 1.0")
+        self.similarity = similarity
+        self.max_distance = int((1.0 - similarity) * FINGERPRINT_BITS + 1e-9)
+        self.min_text_chars = min_text_chars
+        self.shingle_size = shingle_size
+
+        bands = self.max_distance + 1
+        width, extra = divmod(FINGERPRINT_BITS, bands)
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for band in range(bands):
+            bits = width + (1 if band < extra else 0)
+            self._bands.append((shift, (1 << bits) - 1))
+            shift += bits
+
+        self._lock = threading.Lock()
+        self._urls: Dict[str, str] = {}
+        self._tables: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in self._bands]
+        self.fingerprints = 0
+        self.url_duplicates = 0
+        self.content_duplicates = 0
+
+    def claim_url(self, url: str, owner: str) -> Optional[str]:
+        """
+        Takes url for owner; returns the other owner that already has it, if any. URLs that
+        cannot be canonicalized are keyed as given.
+        """
+        key = url_key(url)
+        with self._lock:
+            holder = self._urls.setdefault(key, owner)
+            if holder == owner:
+                return None
+            self.url_duplicates += 1
+        observability.inc(observability.DUPLICATES, kind="url")
+        return holder
+
+    def release_url(self, url: str, owner: str):
+        """Gives url back if owner holds it, for a candidate claimed but not taken."""
+        key = url_key(url)
+        with self._lock:
+            if self._urls.get(key) == owner:
+                del self._urls[key]
+
+    def claim_content(self, text: str, owner: str) -> Optional[str]:
+        """
+        Takes the content for owner; returns the other owner of a near-identical text,
+        if any. Texts too short to fingerprint are always accepted.
+        """
+        if len(text) < self.min_text_chars:
+            return None
+        fingerprint = simhash(text, self.shingle_size)
+        keys = [(fingerprint >> shift) & mask for shift, mask in self._bands]
+        with self._lock:
+            holder = self._find(fingerprint, keys)
+            if holder is None:
+                for table, key in zip(self._tables, keys):
+                    table.setdefault(key, []).append((fingerprint, owner))
+                self.fingerprints += 1
+                return None
+            if holder == owner:
+                return None
+            self.content_duplicates += 1
+        observability.inc(observability.DUPLICATES, kind="content")
+        return holder
+
+    def _find(self, fingerprint: int, keys: List[int]) -> Optional[str]:
+        for table, key in zip(self._tables, keys):
+            for other, holder in table.get(key, ()):
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    return holder
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "urls": len(self._urls),
+                "fingerprints": self.fingerprints,
+                "url_duplicates": self.url_duplicates,
+                "content_duplicates": self.content_duplicates,
+            }
@@ -0,0 +1,155 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from project.core import observability
+
+# Setup logger
+cache_logger = logging.getLogger("ExtractionCache")
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "edumentor", "extraction_cache.sqlite3")
+
+@dataclass
+class CachedExtraction:
+    """A cached extraction result plus the validators needed to revalidate it."""
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    is_fresh: bool
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for a conditional GET that lets the server answer 304 Not Modified."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ExtractionCache:
+    """
+    Disk-backed (SQLite) cache of cleaned page text, keyed by canonical URL.
+    Entries are fresh for ttl_seconds; stale entries are kept so they can be revalidated
+    with a conditional GET. The least recently used entries are evicted once either
+    max_entries or max_bytes (total cached text) is exceeded.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 2000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 24 * 60 * 60,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " url TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_access ON extractions (last_access)")
+        cache_logger.info(f"ExtractionCache opened at {path} (ttl={ttl_seconds}s, max_entries={max_entries}).")
+
+    def get(self, url: str) -> Optional[CachedExtraction]:
+        """Looks up a canonical URL, counting a hit, a stale entry or a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, etag, last_modified, fetched_at FROM extractions WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                observability.inc(observability.CACHE_LOOKUPS, cache="extraction", result="miss")
+                return None
+
+            self._conn.execute("UPDATE extractions SET last_access = ? WHERE url = ?", (now, url))
+            is_fresh = now - row[3] < self.ttl_seconds
+            if is_fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+        observability.inc(observability.CACHE_LOOKUPS, cache="extraction", result="hit" if is_fresh else "stale")
+
+        return CachedExtraction(url, row[0], row[1], row[2], row[3], is_fresh)
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Stores freshly extracted text and its validators, then enforces the size bounds."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (url, text, etag, last_modified, fetched_at, last_access, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, text, etag, last_modified, now, now, len(text.encode("utf-8")))
+            )
+            self._evict()
+
+    def mark_not_modified(self, url: str):
+        """Records a 304 revalidation: the stored text is fresh again without being re-parsed."""
+        with self._lock:
+            self.not_modified += 1
+            self._conn.execute("UPDATE extractions SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def _evict(self):
+        """Deletes least recently used entries until both bounds hold. Caller holds the lock."""
+        count, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        while count > self.max_entries or total_bytes > self.max_bytes:
+            row = self._conn.execute("SELECT url, size FROM extractions ORDER BY last_access LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM extractions WHERE url = ?", (row[0],))
+            self.evictions += 1
+            count -= 1
+            total_bytes -= row[1]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM extractions")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/revalidation counters and current occupancy for monitoring."""
+        with self._lock:
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+            ).fetchone()
+            lookups = self.hits + self.stale + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "revalidated_not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "hit_ratio": round((self.hits + self.not_modified) / lookups, 4) if lookups else 0.0,
+                "entries": count,
+                "bytes": total_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
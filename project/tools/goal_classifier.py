@@ -0,0 +1,273 @@
+"""
+Offline goal classifier: maps a learning goal to one of the curated categories in
+goal_categories.json and returns that category's topics. It is the decomposition used
+whenever the LLM is unavailable.
+
+A category matches when any of its keywords occurs in the lowercased goal (a plain
+substring test). Among matching categories the lowest "priority" wins (ties go to the
+one listed first); a matched modifier keyword (e.g. "advanced") selects the category's
+variant of that name, if it has one. Goals matching nothing get the "default" topics.
+
+All keywords are compiled into one Aho-Corasick automaton, so a goal is classified in a
+single pass over its characters however many categories there are. By default the
+automaton is compiled in memory on first use. To skip that at startup, save the compiled
+form (marshal) and point GOAL_CLASSIFIER_PATH at it; it is reused while the source file
+is unchanged, and rewritten (best effort) when it is not:
+
+    python -m project.tools.goal_classifier [--source goal_categories.json] [--output goal_classifier.bin]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import marshal
+import os
+import struct
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# Setup logger
+classifier_logger = logging.getLogger("GoalClassifier")
+
+DEFAULT_SOURCE_PATH = os.environ.get(
+    "GOAL_CATEGORIES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "goal_categories.json")
+)
+# Compiled file used by get_goal_classifier(); None compiles in memory and writes nothing
+DEFAULT_COMPILED_PATH = os.environ.get("GOAL_CLASSIFIER_PATH") or None
+# Where the command line writes when neither --output nor GOAL_CLASSIFIER_PATH is given
+CACHE_COMPILED_PATH = os.path.join(os.path.expanduser("~"), ".cache", "edumentor", "goal_classifier.bin")
+
+# Compiled file: magic | format version u16 | marshal version u16 | sha256 of the source | marshal payload
+_MAGIC = b"EDGC"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHH32s")
+# Transition keys pack (state, code point); code points fit in 21 bits
+_CHAR_BITS = 21
+_NO_MATCH = -1
+
+Topics = List[Dict[str, str]]
+
+
+class GoalClassifier:
+    """
+    A compiled category index. Build one with compile() from the parsed JSON spec, or
+    load() a saved one; classify() and topics() are thread-safe.
+    """
+
+    def __init__(
+        self,
+        categories: List[Tuple[str, Topics, Dict[str, Topics]]],
+        modifiers: List[str],
+        default: Topics,
+        goto: Dict[int, int],
+        fail: List[int],
+        outputs: Dict[int, Tuple[int, int]],
+    ):
+        # categories are in rank order: (name, topics, variants by modifier name)
+        self.categories = categories
+        self.modifiers = modifiers
+        self.default = default
+        self._goto = goto
+        self._fail = fail
+        # state -> (best category rank or _NO_MATCH, bitmask of modifiers), merged along fail links
+        self._outputs = outputs
+
+    # --- Building ---
+
+    @classmethod
+    def compile(cls, spec: Dict[str, Any]) -> "GoalClassifier":
+        """Builds the automaton for a spec shaped like goal_categories.json."""
+        entries = spec.get("categories", [])
+        order = sorted(range(len(entries)), key=lambda index: (entries[index].get("priority", 0), index))
+        categories = [
+            (entries[index]["name"], entries[index]["topics"], entries[index].get("variants", {}))
+            for index in order
+        ]
+        modifiers = list(spec.get("modifiers", {}))
+
+        children: List[Dict[str, int]] = [{}]
+        own: List[List[int]] = [[_NO_MATCH, 0]]
+
+        def insert(keyword: str) -> Optional[int]:
+            keyword = keyword.lower()
+            if not keyword:
+                return None
+            state = 0
+            for char in keyword:
+                child = children[state].get(char)
+                if child is None:
+                    child = children[state][char] = len(children)
+                    children.append({})
+                    own.append([_NO_MATCH, 0])
+                state = child
+            return state
+
+        for rank, index in enumerate(order):
+            for keyword in entries[index].get("keywords", []):
+                state = insert(keyword)
+                if state is not None and (own[state][0] == _NO_MATCH or rank < own[state][0]):
+                    own[state][0] = rank
+        for bit, name in enumerate(modifiers):
+            for keyword in spec["modifiers"][name]:
+                state = insert(keyword)
+                if state is not None:
+                    own[state][1] |= 1 << bit
+
+        # Breadth-first failure links; each state inherits the matches of its fail state
+        fail = [0] * len(children)
+        queue = deque(children[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in children[state].items():
+                target = fail[state]
+                while target and char not in children[target]:
+                    target = fail[target]
+                fail[child] = children[target].get(char, 0)
+                inherited = own[fail[child]]
+                if inherited[0] != _NO_MATCH and (own[child][0] == _NO_MATCH or inherited[0] < own[child][0]):
+                    own[child][0] = inherited[0]
+                own[child][1] |= inherited[1]
+                queue.append(child)
+
+        goto = {
+            (state << _CHAR_BITS) | ord(char): child
+            for state, edges in enumerate(children) for char, child in edges.items()
+        }
+        outputs = {state: (rank, mask) for state, (rank, mask) in enumerate(own) if rank != _NO_MATCH or mask}
+        return cls(categories, modifiers, spec.get("default", []), goto, fail, outputs)
+
+    # --- Classification ---
+
+    def _match(self, goal: str) -> Tuple[int, Optional[str]]:
+        """(category rank or _NO_MATCH, applied modifier) for goal."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        best, mask, state = _NO_MATCH, 0, 0
+        for char in goal.lower():
+            code = ord(char)
+            while True:
+                child = goto.get((state << _CHAR_BITS) | code)
+                if child is not None:
+                    state = child
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            output = outputs.get(state)
+            if output is not None:
+                if output[0] != _NO_MATCH and (best == _NO_MATCH or output[0] < best):
+                    best = output[0]
+                mask |= output[1]
+
+        if best == _NO_MATCH:
+            return best, None
+        variants = self.categories[best][2]
+        for bit, modifier in enumerate(self.modifiers):
+            if mask >> bit & 1 and modifier in variants:
+                return best, modifier
+        return best, None
+
+    def classify(self, goal: str) -> Tuple[Optional[str], Optional[str]]:
+        """(category name, applied modifier) for goal; (None, None) if no category matches."""
+        rank, modifier = self._match(goal)
+        return (self.categories[rank][0], modifier) if rank != _NO_MATCH else (None, None)
+
+    def topics(self, goal: str) -> Topics:
+        """The topics for goal, as fresh dicts the caller may modify."""
+        rank, modifier = self._match(goal)
+        if rank == _NO_MATCH:
+            topics = self.default
+        else:
+            _, topics, variants = self.categories[rank]
+            if modifier is not None:
+                topics = variants[modifier]
+        return [dict(topic) for topic in topics]
+
+    # --- Persistence ---
+
+    def _payload(self) -> tuple:
+        return (self.categories, self.modifiers, self.default, self._goto, self._fail, self._outputs)
+
+    def save(self, path: str, source_digest: bytes):
+        """Writes the compiled form atomically, tagged with the digest of its source."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, marshal.version, source_digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(marshal.dumps(self._payload()))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, source_digest: Optional[bytes] = None) -> Optional["GoalClassifier"]:
+        """
+        Reads a compiled classifier; None if the file is missing, from another format or
+        marshal version, or (with source_digest) compiled from a different source.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, marshal_version, digest = _HEADER.unpack_from(data, 0)
+            if magic != _MAGIC or version != _FORMAT_VERSION or marshal_version != marshal.version:
+                return None
+            if source_digest is not None and digest != source_digest:
+                return None
+            return cls(*marshal.loads(data[_HEADER.size:]))
+        except FileNotFoundError:
+            return None
+        except (OSError, struct.error, ValueError, EOFError, TypeError) as e:
+            classifier_logger.warning(f"Could not load compiled goal classifier {path}: {e}")
+            return None
+
+    @classmethod
+    def from_source(cls, source_path: str = DEFAULT_SOURCE_PATH, compiled_path: Optional[str] = DEFAULT_COMPILED_PATH) -> "GoalClassifier":
+        """
+        The classifier for a JSON source: loaded from compiled_path when that was compiled
+        from the same source, otherwise compiled and (best effort) saved there.
+        """
+        with open(source_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).digest()
+        if compiled_path:
+            classifier = cls.load(compiled_path, digest)
+            if classifier is not None:
+                return classifier
+
+        classifier = cls.compile(json.loads(raw))
+        if compiled_path:
+            try:
+                classifier.save(compiled_path, digest)
+                classifier_logger.info("Compiled %d goal categories to %s.", len(classifier.categories), compiled_path)
+            except OSError as e:
+                classifier_logger.warning(f"Could not save compiled goal classifier to {compiled_path}: {e}")
+        return classifier
+
+
+_classifier: Optional[GoalClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_goal_classifier() -> GoalClassifier:
+    """The process-wide classifier for the default source, built on first use."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = GoalClassifier.from_source()
+    return _classifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=DEFAULT_SOURCE_PATH)
+    parser.add_argument("--output", default=DEFAULT_COMPILED_PATH or CACHE_COMPILED_PATH)
+    args = parser.parse_args()
+
+    with open(args.source, "rb") as f:
+        raw = f.read()
+    classifier = GoalClassifier.compile(json.loads(raw))
+    classifier.save(args.output, hashlib.sha256(raw).digest())
+    print(f"Compiled {len(classifier.categories)} categories ({len(classifier._fail)} states) to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional, Tuple
+
+# Tags whose text RealDataExtractorTool keeps
+TEXT_TAGS = frozenset(["p", "h1", "h2", "li"])
+# Void elements never hold content (mirrors BeautifulSoup's HTML tree builder)
+VOID_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+    "meta", "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame",
+    "image", "isindex", "nextid", "spacer",
+])
+# Text inside these tags is not returned by BeautifulSoup's get_text()
+HIDDEN_TEXT_TAGS = frozenset(["script", "style", "template", "rt", "rp"])
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+def _lookup(candidate: Optional[str]) -> Optional[str]:
+    try:
+        return codecs.lookup(candidate).name if candidate else None
+    except LookupError:
+        return None
+
+def declared_encoding(content_type: Optional[str], head: bytes) -> Optional[str]:
+    """The charset declared by the Content-Type header or a <meta> tag, if any."""
+    for source in (content_type or "").split(";")[1:]:
+        key, _, value = source.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip("\"' ")
+    match = _META_CHARSET.search(head[:4096])
+    return match.group(1).decode("ascii") if match else None
+
+def detect_encoding(head: bytes) -> str:
+    """
+    Encoding of an undeclared document, from its first bytes: a BOM, else UTF-8 if the bytes
+    are valid UTF-8, else what BeautifulSoup's UnicodeDammit detects (as the tree path does).
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        # Incremental, so a multi-byte character cut off at the end of head is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    from bs4.dammit import UnicodeDammit
+    return _lookup(UnicodeDammit(head, is_html=True).original_encoding) or "windows-1252"
+
+def sniff_encoding(content_type: Optional[str], head: bytes) -> str:
+    """Picks a text encoding from the Content-Type charset, a <meta> charset, or the content itself."""
+    declared = declared_encoding(content_type, head)
+    if declared is not None:
+        return _lookup(declared) or "utf-8"
+    return detect_encoding(head)
+
+class StreamingTextExtractor(HTMLParser):
+    """
+    Incremental equivalent of
+        ' '.join(e.get_text(separator=' ', strip=True) for e in soup.find_all(TEXT_TAGS))[:max_chars]
+    on a BeautifulSoup 'html.parser' tree, without building the tree.
+    Feed it decoded chunks; once the first max_chars characters of the result can no longer
+    change, `done` becomes True and the caller can stop reading.
+    """
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.done = False
+
+        # One entry per text tag, in start-tag (document) order, like find_all
+        self._parts: List[List[str]] = []
+        self._part_lengths: List[int] = []
+        self._closed: List[bool] = []
+        # Open tags as (name, index into _parts or None)
+        self._stack: List[Tuple[str, Optional[int]]] = []
+        self._hidden_depth = 0
+        self._pending_data: List[str] = []
+        # Void tags opened with <tag>; a matching </tag> is then swallowed without ending the string
+        self._closed_void: List[str] = []
+        # Leading run of closed parts whose joined length is final
+        self._frozen = 0
+        self._frozen_length = 0
+
+    def feed_chunks(self, chunks: Iterable[str]) -> str:
+        """Feeds chunks until the character budget is met (or input ends) and returns the text."""
+        for chunk in chunks:
+            self.feed(chunk)
+            if self.done:
+                break
+        return self.text()
+
+    def text(self) -> str:
+        self._flush_data()
+        return " ".join(" ".join(part) for part in self._parts)[:self.max_chars]
+
+    # --- HTMLParser callbacks ---
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_data()
+        if tag in VOID_TAGS:
+            self._closed_void.append(tag)
+            return
+        index = None
+        if tag in TEXT_TAGS:
+            index = self._open_part()
+        if tag in HIDDEN_TEXT_TAGS:
+            self._hidden_depth += 1
+        self._stack.append((tag, index))
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_data()
+        if tag in TEXT_TAGS and tag not in VOID_TAGS:
+            self._closed[self._open_part()] = True
+            self._advance()
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_void:
+            self._closed_void.remove(tag)
+            return
+        self._flush_data()
+        # Like BeautifulSoup, an end tag closes the most recent matching open tag and
+        # everything opened after it; end tags without an open match are ignored.
+        for position in range(len(self._stack) - 1, -1, -1):
+            if self._stack[position][0] == tag:
+                for name, index in self._stack[position:]:
+                    if index is not None:
+                        self._closed[index] = True
+                    if name in HIDDEN_TEXT_TAGS:
+                        self._hidden_depth -= 1
+                del self._stack[position:]
+                self._advance()
+                return
+
+    def handle_data(self, data):
+        self._pending_data.append(data)
+
+    def unknown_decl(self, data):
+        self._flush_data()
+        # CDATA sections are kept by get_text(), even inside hidden-text tags; other declarations are not
+        if data.startswith("CDATA["):
+            self._add_string(data[len("CDATA["):], hidden=False)
+
+    def handle_comment(self, data):
+        self._flush_data()
+
+    def handle_decl(self, decl):
+        self._flush_data()
+
+    def handle_pi(self, data):
+        self._flush_data()
+
+    # --- helpers ---
+
+    def _open_part(self) -> int:
+        self._parts.append([])
+        self._part_lengths.append(0)
+        self._closed.append(False)
+        return len(self._parts) - 1
+
+    def _flush_data(self):
+        # Adjacent data events form a single string in the tree, so strip them together
+        if self._pending_data:
+            string = "".join(self._pending_data)
+            self._pending_data = []
+            self._add_string(string, hidden=self._hidden_depth > 0)
+
+    def _add_string(self, string: str, hidden: bool):
+        string = string.strip()
+        if not string or hidden:
+            return
+        for _, index in self._stack:
+            if index is not None:
+                part = self._parts[index]
+                self._part_lengths[index] += len(string) + (1 if part else 0)
+                part.append(string)
+        self._advance()
+
+    def _advance(self):
+        """Freezes closed leading parts and flags `done` once the output prefix is settled."""
+        while self._frozen < len(self._parts) and self._closed[self._frozen]:
+            self._frozen_length += self._part_lengths[self._frozen] + (1 if self._frozen else 0)
+            self._frozen += 1
+
+        settled = self._frozen_length
+        if self._frozen < len(self._parts):
+            # The first open part only grows at its end, so its current text is settled too
+            settled += self._part_lengths[self._frozen] + (1 if self._frozen else 0)
+        if settled >= self.max_chars:
+            self.done = True
+
+def decode_chunks(chunks: Iterable[bytes], content_type: Optional[str]) -> Iterable[str]:
+    """Incrementally decodes a byte stream, sniffing the encoding from the first chunk."""
+    decoder = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(sniff_encoding(content_type, chunk))(errors="replace")
+        yield decoder.decode(chunk)
+    if decoder is not None:
+        yield decoder.decode(b"", final=True)
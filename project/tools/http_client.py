@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+
+from project.core.deadline import clamp_timeout
+
+# Setup logger
+http_logger = logging.getLogger("HttpClient")
+
+# Number of per-host pools kept alive, and connections kept per host
+DEFAULT_POOL_CONNECTIONS = 16
+DEFAULT_POOL_MAXSIZE = 8
+DEFAULT_USER_AGENT = "EduMentor/1.0"
+# Longest wait for a free connection to a busy host (also capped by the session deadline)
+DEFAULT_POOL_TIMEOUT = 3.0
+
+
+class PoolTimeout(requests.exceptions.ConnectionError):
+    """No connection to the host became free within the pool timeout."""
+
+
+class PoolStats:
+    """Thread-safe counters describing how the connection pools are being used."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.reused = 0
+        self.new_connections = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_reuse(self):
+        with self._lock:
+            self.reused += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                # Checkouts that got a still-open kept-alive connection
+                "hits": self.reused,
+                "new_connections": self.new_connections,
+                # Pooled connections found dropped, which urllib3 reopens in place
+                "reconnects": self.checkouts - self.reused - self.new_connections,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 4),
+            }
+
+
+def _instrumented_pool(base: type, stats: PoolStats, pool_timeout: float) -> type:
+    """
+    Builds a urllib3 pool class that reports checkouts, reuse, new connections and waits
+    to stats, and waits at most pool_timeout for a free connection.
+    """
+
+    class InstrumentedPool(base):
+        def _new_conn(self):
+            stats.record_new_connection()
+            return super()._new_conn()
+
+        def _get_conn(self, timeout: Optional[float] = None):
+            stats.record_checkout()
+            if timeout is None:
+                # requests never passes a pool timeout, which would make the wait unbounded
+                timeout = clamp_timeout(pool_timeout)
+            # In blocking mode an empty queue means every connection to this host is busy
+            if self.block and self.pool is not None and self.pool.empty():
+                start = time.perf_counter()
+                try:
+                    conn = super()._get_conn(timeout)
+                finally:
+                    stats.record_wait(time.perf_counter() - start)
+            else:
+                conn = super()._get_conn(timeout)
+            # A dropped connection was closed by _get_conn; a fresh one is not connected yet
+            if conn.is_connected:
+                stats.record_reuse()
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+class _InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pool manager creates instrumented, per-host bounded pools."""
+
+    def __init__(self, stats: PoolStats, pool_timeout: float, **kwargs):
+        # Must be set before HTTPAdapter.__init__, which calls init_poolmanager
+        self._stats = stats
+        self._pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _instrumented_pool(HTTPConnectionPool, self._stats, self._pool_timeout),
+            "https": _instrumented_pool(HTTPSConnectionPool, self._stats, self._pool_timeout),
+        }
+
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as e:
+            # requests re-raises this urllib3 error as is; callers only handle RequestException
+            raise PoolTimeout(e, request=request) from e
+
+
+class HttpClient:
+    """
+    Shared HTTP client for all network tools.
+    Wraps a single requests.Session so connections are kept alive and reused across
+    tool calls, with at most pool_maxsize concurrent connections per host. Further
+    requests to that host wait for a free connection instead of opening new ones, for at
+    most pool_timeout seconds (less if the session deadline is closer), then raise
+    PoolTimeout. Streamed responses hold their connection until they are closed.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        user_agent: str = DEFAULT_USER_AGENT,
+        pool_timeout: float = DEFAULT_POOL_TIMEOUT,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_timeout = pool_timeout
+        self.pool_stats = PoolStats()
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = _InstrumentedAdapter(
+            self.pool_stats,
+            pool_timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        http_logger.info(f"HttpClient initialized (pool_connections={pool_connections}, pool_maxsize={pool_maxsize}).")
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.session.post(url, **kwargs)
+
+    def prewarm(self, urls: List[str], timeout: float = 3.0) -> int:
+        """
+        Opens a keep-alive connection (DNS, TCP and TLS) to the host of each URL ahead of
+        the first real request. Failures are logged and ignored; returns the number of
+        hosts that answered.
+        """
+        warmed = 0
+        for url in urls:
+            try:
+                # Any status proves the connection is up; it is returned to the pool afterwards
+                self.session.head(url, timeout=timeout, allow_redirects=False).close()
+                warmed += 1
+            except requests.exceptions.RequestException as e:
+                http_logger.warning(f"Could not pre-warm a connection to {url}: {e}")
+        return warmed
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns pool usage counters, useful for sizing pool_maxsize."""
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_timeout": self.pool_timeout,
+            **self.pool_stats.snapshot(),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Returns the process-wide HttpClient, creating it with default settings on first use."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+    return _shared_client
+
+
+def configure_http_client(**kwargs) -> HttpClient:
+    """Replaces the process-wide HttpClient, e.g. to resize its pools. Call before serving traffic."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = HttpClient(**kwargs)
+    return _shared_client
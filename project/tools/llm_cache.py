@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from project.core import observability
+
+# Setup logger
+llm_cache_logger = logging.getLogger("DecompositionCache")
+
+# Everything except word characters, whitespace and the symbols that carry meaning in goals ("C++", "C#")
+_GOAL_NOISE = re.compile(r"[^\w\s+#]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_goal(user_input: str) -> str:
+    """
+    Maps trivially different spellings of a goal to one key:
+    "Learn Python basics" and "learn python  basics!" both become "learn python basics".
+    """
+    text = unicodedata.normalize("NFKC", user_input).casefold()
+    text = _GOAL_NOISE.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+class DecompositionCache:
+    """
+    Bounded LRU cache of goal decompositions with a TTL, optionally persisted as JSON.
+    Every entry is tagged with a namespace (derived from the model and prompt template),
+    so entries produced by a different prompt are never served and are dropped on load.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 7 * 24 * 60 * 60,
+        path: Optional[str] = None,
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+
+        self._lock = threading.Lock()
+        # key -> (stored_at, topics)
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, str]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        if path:
+            self._load()
+
+    def get(self, key: str) -> Optional[List[Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                observability.inc(observability.CACHE_LOOKUPS, cache="decomposition", result="hit")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            observability.inc(observability.CACHE_LOOKUPS, cache="decomposition", result="miss")
+            return None
+
+    def put(self, key: str, topics: List[Dict[str, str]]):
+        with self._lock:
+            self._entries[key] = (time.time(), topics)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if self.path:
+                self._save()
+
+    def record_coalesced(self):
+        with self._lock:
+            self.coalesced += 1
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drops one normalized goal, or every entry when key is None (e.g. after a prompt change)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            if self.path:
+                self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            llm_cache_logger.warning(f"Ignoring unreadable decomposition cache {self.path}: {e}")
+            return
+
+        if data.get("namespace") != self.namespace:
+            llm_cache_logger.info("Decomposition cache was built with a different prompt/model; starting empty.")
+            return
+
+        now = time.time()
+        for key, stored_at, topics in data.get("entries", []):
+            if now - stored_at < self.ttl_seconds:
+                self._entries[key] = (stored_at, topics)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        llm_cache_logger.info(f"Loaded {len(self._entries)} cached decompositions from {self.path}.")
+
+    def _save(self):
+        """Writes the cache atomically. Caller holds the lock."""
+        payload = {
+            "namespace": self.namespace,
+            "entries": [[key, stored_at, topics] for key, (stored_at, topics) in self._entries.items()],
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            llm_cache_logger.error(f"Could not persist decomposition cache to {self.path}: {e}")
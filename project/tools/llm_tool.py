@@ -1,7 +1,18 @@
+import asyncio
+import contextlib
+import hashlib
 import logging
-from typing import Optional, Any, Dict, List
+import threading
+from concurrent.futures import CancelledError as FutureCancelledError, Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Any, Dict, List, Tuple
 import json
 
+from project.core import observability
+from project.core.deadline import has_budget, record_degradation, time_left
+from project.tools.goal_classifier import get_goal_classifier
+from project.tools.llm_cache import DecompositionCache, normalize_goal
+from project.tools.rate_limit import ProviderLimiter, RateLimitExceeded
+
 # Setup logger
 llm_logger = logging.getLogger("LLMTool")
 
@@ -9,51 +20,150 @@ class LLMTool:
     """
     Tool to perform complex reasoning tasks like goal decomposition using an LLM.
     Uses MOCK logic if the Gemini API is not available or key is missing.
+
+    Real decompositions are memoized by normalized goal (see DecompositionCache), and
+    concurrent calls for the same normalized goal share a single in-flight LLM request.
+
+    Under a session deadline (see project.core.deadline) with less than min_budget_seconds
+    left, a goal that is not cached is decomposed by the mock logic instead of the LLM.
     """
-    def __init__(self, api_key: Optional[str] = None):
+    MODEL = 'gemini-2.5-flash'
+
+    # The prompt is designed to enforce a specific, parsable JSON structure.
+    # Editing it (or MODEL) changes the cache namespace, so stale decompositions are not reused.
+    PROMPT_TEMPLATE = (
+        "The user wants to learn: '{user_input}'. "
+        "Decompose this goal into exactly 3 diverse and sequential sub-topics. "
+        "For each topic, suggest the best content type from: Video, Article, Quiz. "
+        "Respond ONLY with a JSON list in the format: "
+        "[{{'topic': 'Topic Title', 'type': 'Content Type'}}, ...]. Do not include any other text."
+    )
+
+    def __init__(self, api_key: Optional[str] = None, cache_config: Optional[Dict[str, Any]] = None, rate_limiter: Optional[ProviderLimiter] = None, min_budget_seconds: float = 0.0):
         self.name = "LLM Decomposition Tool"
         self.api_key = api_key
-        self.client = None
+        self.rate_limiter = rate_limiter
+        self.min_budget_seconds = min_budget_seconds
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.cache: Optional[DecompositionCache] = None
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
 
-        # Check for real API key and attempt to initialize the real client
+        # The Gemini SDK is imported and its client built on first use (see client)
         if self.api_key:
+            llm_logger.info("LLMTool configured for the real Gemini Client.")
+        else:
+            llm_logger.warning("Using MOCK LLM Tool.")
+
+        if cache_config is not None:
+            self.cache = DecompositionCache(self.cache_namespace(), **cache_config)
+
+    @property
+    def client(self) -> Optional[Any]:
+        """The Gemini client, created on first access; None means the MOCK logic is used."""
+        if self._client is None and self.api_key:
+            with self._client_lock:
+                if self._client is None and self.api_key:
+                    try:
+                        from google import genai
+                        self._client = genai.Client(api_key=self.api_key)
+                        llm_logger.info("LLMTool initialized with real Gemini Client.")
+                    except ImportError:
+                        llm_logger.warning("Google GenAI SDK not found. Using MOCK LLM Tool.")
+                        self.api_key = None
+                    except Exception as e:
+                        llm_logger.error(f"Error initializing Gemini Client: {e}. Using MOCK LLM Tool.")
+                        self.api_key = None
+        return self._client
+
+    def warm_client(self) -> bool:
+        """Creates the Gemini client now rather than on the first request; False if the MOCK logic will be used."""
+        return self.client is not None
+
+    @classmethod
+    def cache_namespace(cls) -> str:
+        """Identifies the model + prompt template that produced a cached decomposition."""
+        return hashlib.sha256(f"{cls.MODEL}\n{cls.PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()[:16]
+
+    def invalidate_cache(self, user_input: Optional[str] = None):
+        """Forgets the cached decomposition of one goal, or of all goals."""
+        if self.cache:
+            self.cache.invalidate(normalize_goal(user_input) if user_input is not None else None)
+
+    def _mock_decompose(self, user_input: str) -> List[Dict[str, str]]:
+        """Offline fallback: the topics of the goal's curated category (see goal_classifier)."""
+        return get_goal_classifier().topics(user_input)
+
+    def _build_prompt(self, user_input: str) -> str:
+        return self.PROMPT_TEMPLATE.format(user_input=user_input)
+
+    def _lookup(self, key: str) -> Optional[List[Dict[str, str]]]:
+        topics = self.cache.get(key) if self.cache else None
+        return [dict(topic) for topic in topics] if topics is not None else None
+
+    def _begin_flight(self, key: str) -> Tuple[Future, bool]:
+        """Returns the in-flight Future for key and whether the caller must produce its result."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                if self.cache:
+                    self.cache.record_coalesced()
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _end_flight(self, key: str, future: Future, topics: Optional[List[Dict[str, str]]] = None):
+        """Publishes the leader's topics to waiting callers; None if the leader was interrupted."""
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        future.set_result(topics)
+
+    def _followed(self, key: str, user_input: str, topics: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """A follower's copy of the leader's topics, or the fallback if the leader gave up."""
+        if topics is None:
+            return self._finish(key, user_input, None, RuntimeError("the request decomposing this goal was interrupted"))
+        return [dict(topic) for topic in topics]
+
+    def _finish(self, key: str, user_input: str, response_text: Optional[str], error: Optional[Exception]) -> List[Dict[str, str]]:
+        """Parses an LLM response (caching it) or falls back to the mock decomposition."""
+        if error is None:
             try:
-                from google import genai
-                self.client = genai.Client(api_key=self.api_key)
-                llm_logger.info("LLMTool initialized with real Gemini Client.")
-            except ImportError:
-                llm_logger.warning("Google GenAI SDK not found. Using MOCK LLM Tool.")
-                self.api_key = None
+                # The response text should be a valid JSON string
+                topics = json.loads(response_text)
+                llm_logger.info(f"Successfully decomposed goal using LLM.")
+                if self.cache:
+                    self.cache.put(key, topics)
+                return topics
             except Exception as e:
-                llm_logger.error(f"Error initializing Gemini Client: {e}. Using MOCK LLM Tool.")
-                self.api_key = None
+                error = e
 
-        if not self.api_key:
-             llm_logger.warning("Using MOCK LLM Tool.")
+        # Fallbacks are not cached, so the next request retries the LLM
+        llm_logger.error(f"LLM decomposition failed: {error}. Falling back to mock logic.")
+        reason = "throttled" if isinstance(error, RateLimitExceeded) else "error"
+        observability.inc(observability.MOCK_FALLBACKS, tool="llm", reason=reason)
+        return self._mock_decompose(user_input)
 
-    def _mock_decompose(self, user_input: str) -> List[Dict[str, str]]:
-        """Fallback to the hardcoded logic you were using."""
-        normalized_input = user_input.lower()
-
-        # This is the last version of your robust mock logic
-        if "python" in normalized_input:
-            topics = [{"topic": "Python Variables and Types", "type": "Video"}, {"topic": "Basic Control Flow (If/Else)", "type": "Article"}, {"topic": "Writing Your First Function", "type": "Quiz"}]
-        elif "javascript" in normalized_input:
-            if "advanced" in normalized_input:
-                topics = [{"topic": "JavaScript Design Patterns and Modules", "type": "Article"}, {"topic": "Advanced Reactivity and State Management", "type": "Video"}, {"topic": "Deep Dive into the Event Loop", "type": "Quiz"}]
-            else:
-                topics = [{"topic": "JavaScript Variables and Data Types", "type": "Article"}, {"topic": "DOM Manipulation Basics", "type": "Video"}, {"topic": "Asynchronous JavaScript (Promises)", "type": "Quiz"}]
-        elif "dsa" in normalized_input or "data structures" in normalized_input or "algorithms" in normalized_input:
-            if "advanced" in normalized_input:
-                topics = [{"topic": "Advanced Dynamic Programming", "type": "Article"}, {"topic": "Graph Algorithms (e.g., Dijkstra's, A*)", "type": "Video"}, {"topic": "Complex Tree Structures (e.g., Red-Black Trees)", "type": "Quiz"}]
-            else:
-                topics = [{"topic": "Introduction to Arrays and Linked Lists", "type": "Video"}, {"topic": "Sorting Algorithms (e.g., Merge Sort, Quick Sort)", "type": "Article"}, {"topic": "Understanding Stacks and Queues", "type": "Quiz"}]
-        elif "cloud" in normalized_input:
-            topics = [{"topic": "Cloud Computing Fundamentals (IaaS, PaaS, SaaS)", "type": "Video"}, {"topic": "Introduction to AWS EC2 and S3", "type": "Article"}, {"topic": "Basic Networking Concepts in the Cloud", "type": "Quiz"}]
-        else:
-            topics = [{"topic": "General Programming Principles", "type": "Video"}]
+    def _over_budget(self, user_input: str) -> Optional[List[Dict[str, str]]]:
+        """The mock decomposition when the session deadline leaves no time for the LLM, else None."""
+        if has_budget(self.min_budget_seconds):
+            return None
+        llm_logger.warning("Not enough session budget left for the LLM; using mock decomposition.")
+        record_degradation("llm", "mock_decomposition")
+        observability.inc(observability.MOCK_FALLBACKS, tool="llm", reason="deadline")
+        return self._mock_decompose(user_input)
 
-        return topics
+    def _follower_timeout(self) -> Optional[float]:
+        left = time_left()
+        return None if left is None else max(0.0, left)
+
+    def _admit(self):
+        """Waits for the Gemini rate limiter, if any; the result is used as a context manager."""
+        return self.rate_limiter.acquire() if self.rate_limiter else contextlib.nullcontext()
+
+    async def _aadmit(self):
+        return await self.rate_limiter.aacquire() if self.rate_limiter else contextlib.nullcontext()
 
     def decompose(self, user_input: str) -> List[Dict[str, str]]:
         """Executes the goal decomposition using the real LLM or the mock logic."""
@@ -61,27 +171,88 @@ class LLMTool:
         if not self.client:
             return self._mock_decompose(user_input)
 
+        key = normalize_goal(user_input)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        degraded = self._over_budget(user_input)
+        if degraded is not None:
+            return degraded
+
+        future, is_leader = self._begin_flight(key)
+        if not is_leader:
+            try:
+                topics = future.result(timeout=self._follower_timeout())
+            except FutureTimeoutError:
+                return self._over_budget(user_input) or self._mock_decompose(user_input)
+            except FutureCancelledError:
+                topics = None
+            return self._followed(key, user_input, topics)
+
         try:
-            # The prompt is designed to enforce a specific, parsable JSON structure
-            prompt = (
-                f"The user wants to learn: '{user_input}'. "
-                "Decompose this goal into exactly 3 diverse and sequential sub-topics. "
-                "For each topic, suggest the best content type from: Video, Article, Quiz. "
-                "Respond ONLY with a JSON list in the format: "
-                "[{'topic': 'Topic Title', 'type': 'Content Type'}, ...]. Do not include any other text."
-            )
-
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt,
-                config={"response_mime_type": "application/json"}
-            )
-
-            # The response text should be a valid JSON string
-            topics = json.loads(response.text)
-            llm_logger.info(f"Successfully decomposed goal using LLM.")
-            return topics
-
-        except Exception as e:
-            llm_logger.error(f"LLM decomposition failed: {e}. Falling back to mock logic.")
+            try:
+                with self._admit():
+                    response = self.client.models.generate_content(
+                        model=self.MODEL,
+                        contents=self._build_prompt(user_input),
+                        config={"response_mime_type": "application/json"}
+                    )
+                topics = self._finish(key, user_input, response.text, None)
+            except Exception as e:
+                topics = self._finish(key, user_input, None, e)
+        except BaseException:
+            # e.g. KeyboardInterrupt: only this caller sees it; waiting callers fall back
+            self._end_flight(key, future)
+            raise
+
+        self._end_flight(key, future, topics)
+        return [dict(topic) for topic in topics]
+
+    async def adecompose(self, user_input: str) -> List[Dict[str, str]]:
+        """Async variant of decompose, using the Gemini client's native asyncio API."""
+
+        if not self.client:
             return self._mock_decompose(user_input)
+
+        key = normalize_goal(user_input)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        degraded = self._over_budget(user_input)
+        if degraded is not None:
+            return degraded
+
+        future, is_leader = self._begin_flight(key)
+        if not is_leader:
+            try:
+                # shield: timing out must not cancel the leader's shared Future
+                topics = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self._follower_timeout())
+            except asyncio.TimeoutError:
+                return self._over_budget(user_input) or self._mock_decompose(user_input)
+            except asyncio.CancelledError:
+                # Only a cancelled shared Future is recovered from; our own cancellation propagates
+                if not future.cancelled():
+                    raise
+                topics = None
+            return self._followed(key, user_input, topics)
+
+        try:
+            try:
+                with await self._aadmit():
+                    response = await self.client.aio.models.generate_content(
+                        model=self.MODEL,
+                        contents=self._build_prompt(user_input),
+                        config={"response_mime_type": "application/json"}
+                    )
+                topics = self._finish(key, user_input, response.text, None)
+            except Exception as e:
+                topics = self._finish(key, user_input, None, e)
+        except BaseException:
+            # e.g. cancellation: only this task sees it; waiting callers fall back
+            self._end_flight(key, future)
+            raise
+
+        self._end_flight(key, future, topics)
+        return [dict(topic) for topic in topics]
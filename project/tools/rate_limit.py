@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from project.core import observability
+from project.core.deadline import time_left
+
+# Setup logger
+rate_limit_logger = logging.getLogger("RateLimiter")
+
+# Starting limits per provider; MainAgent's "rate_limits" config overrides them
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, Any]] = {
+    "google_cse": {"rate_per_second": 5.0, "burst": 10, "daily_quota": None, "max_concurrency": 8},
+    "gemini": {"rate_per_second": 2.0, "burst": 5, "daily_quota": None, "max_concurrency": 4},
+    "huggingface": {"rate_per_second": 5.0, "burst": 10, "daily_quota": None, "max_concurrency": 4},
+}
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a call cannot be admitted within max_wait, or the daily quota is spent."""
+
+    def __init__(self, provider: str, reason: str, message: str):
+        super().__init__(message)
+        self.provider = provider
+        self.reason = reason
+
+
+class Permit:
+    """
+    One admitted call. Report the provider's answer with observe(); leaving the block
+    releases the concurrency slot and feeds the outcome back into the limiter.
+    """
+
+    __slots__ = ("limiter", "started", "status", "retry_after", "_observed")
+
+    def __init__(self, limiter: "ProviderLimiter"):
+        self.limiter = limiter
+        self.started = time.monotonic()
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self._observed = False
+
+    def observe(self, status: Optional[int], retry_after: Optional[float] = None):
+        self.status = status
+        self.retry_after = retry_after
+        self._observed = True
+
+    def __enter__(self) -> "Permit":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and not self._observed:
+            # SDK errors carry the HTTP status as .code, requests errors on .response
+            status = getattr(exc, "code", None)
+            if not isinstance(status, int):
+                status = getattr(getattr(exc, "response", None), "status_code", None)
+            if isinstance(status, int):
+                self.observe(status)
+        # An exception without any answer (timeout, connection reset) counts as overload
+        failed = exc_type is not None and not self._observed
+        self.limiter._release(self, failed)
+        return False
+
+    async def __aenter__(self) -> "Permit":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class ProviderLimiter:
+    """
+    Admission control for one external API, shared by every tool and session calling it:
+    - a token bucket of burst tokens refilled at rate_per_second,
+    - a daily quota, reset at midnight UTC,
+    - an AIMD concurrency limit between min_concurrency and max_concurrency: it grows by
+      about one slot per window of successful calls and halves on a 429, a 5xx, a failed
+      call or (with latency_target) a slow one, at most once per decrease_cooldown,
+    - a Retry-After pause after a 429 that carries the header.
+    Callers wait up to max_wait seconds (less if the session deadline is closer) for
+    admission, then get RateLimitExceeded.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        rate_per_second: Optional[float] = None,
+        burst: int = 1,
+        daily_quota: Optional[int] = None,
+        min_concurrency: int = 1,
+        max_concurrency: int = 8,
+        max_wait: float = 10.0,
+        latency_target: Optional[float] = None,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.provider = provider
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self._day = self._today()
+        self.quota_used = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+        self.requests = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.rejected: Dict[str, int] = {"max_wait": 0, "quota": 0}
+        self.decreases = 0
+
+        self.configure(
+            rate_per_second=rate_per_second, burst=burst, daily_quota=daily_quota,
+            min_concurrency=min_concurrency, max_concurrency=max_concurrency, max_wait=max_wait,
+            latency_target=latency_target, decrease_cooldown=decrease_cooldown
+        )
+        self.concurrency_limit = float(self.max_concurrency)
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+
+    def configure(self, **settings):
+        """Updates limits in place, keeping the current bucket, quota and concurrency state."""
+        with self._cond:
+            for name, value in settings.items():
+                if name not in ("rate_per_second", "burst", "daily_quota", "min_concurrency",
+                                "max_concurrency", "max_wait", "latency_target", "decrease_cooldown"):
+                    raise TypeError(f"Unknown rate limit setting: {name}")
+                setattr(self, name, value)
+            self.burst = max(1, int(self.burst))
+            self.min_concurrency = max(1, int(self.min_concurrency))
+            self.max_concurrency = max(self.min_concurrency, int(self.max_concurrency))
+            if hasattr(self, "concurrency_limit"):
+                self.concurrency_limit = min(max(self.concurrency_limit, self.min_concurrency), self.max_concurrency)
+                self._tokens = min(self._tokens, self.burst)
+            self._cond.notify_all()
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    # --- Admission ---
+
+    def _reserve(self, now: float) -> Optional[float]:
+        """
+        Takes a slot and a token if both are free and returns 0. Otherwise returns the
+        seconds until a token is due, or None when only a concurrency slot is missing.
+        Must be called with the condition held.
+        """
+        if self.daily_quota is not None:
+            today = self._today()
+            if today != self._day:
+                self._day, self.quota_used = today, 0
+            if self.quota_used >= self.daily_quota:
+                raise self._reject("quota", f"Daily quota of {self.daily_quota} calls to {self.provider} is used up.")
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        if self.rate_per_second:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate_per_second
+
+        if self.in_flight >= int(self.concurrency_limit):
+            return None
+
+        if self.rate_per_second:
+            self._tokens -= 1
+        self.in_flight += 1
+        self.quota_used += 1
+        self.requests += 1
+        return 0.0
+
+    def _reject(self, reason: str, message: str) -> RateLimitExceeded:
+        self.rejected[reason] += 1
+        observability.inc(observability.THROTTLE_REJECTIONS, provider=self.provider, reason=reason)
+        return RateLimitExceeded(self.provider, reason, message)
+
+    def _admitted(self, waited: float) -> Permit:
+        if waited > 0:
+            self.throttled += 1
+            self.throttled_seconds += waited
+            observability.observe(observability.THROTTLE_SECONDS, waited, provider=self.provider)
+        return Permit(self)
+
+    def _max_wait(self) -> float:
+        left = time_left()
+        return self.max_wait if left is None else max(0.0, min(self.max_wait, left))
+
+    def _too_late(self, wait: Optional[float], deadline: float, now: float) -> bool:
+        # Fail fast when the next token is already known to arrive after the deadline
+        return now >= deadline or (wait is not None and now + wait > deadline)
+
+    def acquire(self) -> Permit:
+        """Blocks until the call is admitted; use the returned Permit as a context manager."""
+        start = time.monotonic()
+        max_wait = self._max_wait()
+        deadline = start + max_wait
+        waited = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._reserve(now)
+                if wait == 0:
+                    return self._admitted(now - start if waited else 0.0)
+                if self._too_late(wait, deadline, now):
+                    raise self._reject("max_wait", f"No capacity for {self.provider} within {max_wait:.1f}s.")
+                waited = True
+                self._cond.wait(min(wait, deadline - now) if wait is not None else deadline - now)
+
+    async def aacquire(self) -> Permit:
+        """Async variant of acquire; waits on the event loop instead of blocking a thread."""
+        start = time.monotonic()
+        max_wait = self._max_wait()
+        deadline = start + max_wait
+        waited = False
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                wait = self._reserve(now)
+                if wait == 0:
+                    return self._admitted(now - start if waited else 0.0)
+                if self._too_late(wait, deadline, now):
+                    raise self._reject("max_wait", f"No capacity for {self.provider} within {max_wait:.1f}s.")
+            waited = True
+            # Slot releases cannot wake a coroutine, so poll briefly while waiting for one
+            await asyncio.sleep(min(wait if wait is not None else 0.01, deadline - now))
+
+    # --- Feedback ---
+
+    def _release(self, permit: Permit, failed: bool):
+        now = time.monotonic()
+        status = permit.status
+        overloaded = failed or (status is not None and (status == 429 or status >= 500))
+        slow = self.latency_target is not None and now - permit.started > self.latency_target
+        with self._cond:
+            self.in_flight -= 1
+            if status == 429 and permit.retry_after:
+                self._blocked_until = max(self._blocked_until, now + permit.retry_after)
+            if overloaded or slow:
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._last_decrease = now
+                    self.decreases += 1
+                    self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+                    rate_limit_logger.warning(
+                        "%s %s; concurrency limit lowered to %d.", self.provider,
+                        f"answered {status}" if status else ("is slow" if slow and not failed else "call failed"),
+                        int(self.concurrency_limit)
+                    )
+            else:
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "concurrency_limit": round(self.concurrency_limit, 2),
+                "throttled": self.throttled,
+                "throttled_seconds": round(self.throttled_seconds, 4),
+                "rejected": dict(self.rejected),
+                "decreases": self.decreases,
+                "quota_used": self.quota_used,
+                "daily_quota": self.daily_quota,
+            }
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given in seconds; HTTP dates are ignored."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, settings: Optional[Dict[str, Any]] = None) -> ProviderLimiter:
+    """
+    Returns the process-wide limiter for provider, creating it from DEFAULT_RATE_LIMITS
+    and settings. For an existing limiter, settings update its limits in place.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = ProviderLimiter(
+                provider, **{**DEFAULT_RATE_LIMITS.get(provider, {}), **(settings or {})}
+            )
+            return limiter
+    if settings:
+        limiter.configure(**settings)
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.provider: limiter.stats() for limiter in limiters}
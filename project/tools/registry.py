@@ -0,0 +1,58 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+# Setup logger
+registry_logger = logging.getLogger("ToolRegistry")
+
+class ToolRegistry(Mapping):
+    """
+    Read-only mapping of tool name -> tool whose entries are built on first access.
+    Agents index it like the plain dict they used before; a tool (and whatever its
+    factory imports) costs nothing until a request actually needs it.
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[], Any]]] = None):
+        self._factories: Dict[str, Callable[[], Any]] = dict(factories or {})
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.load_seconds: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def __getitem__(self, name: str) -> Any:
+        tool = self._instances.get(name)
+        if tool is not None:
+            return tool
+        with self._lock:
+            tool = self._instances.get(name)
+            if tool is None:
+                factory = self._factories[name]
+                start = time.perf_counter()
+                tool = factory()
+                self.load_seconds[name] = time.perf_counter() - start
+                self._instances[name] = tool
+                registry_logger.info(f"Loaded tool '{name}' in {1000 * self.load_seconds[name]:.1f}ms.")
+        return tool
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._factories))
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Returns the tool only if it has already been built."""
+        return self._instances.get(name)
+
+    def loaded(self) -> List[str]:
+        return list(self._instances)
+
+    def load_all(self):
+        """Builds every tool now, e.g. to pre-warm a long-lived runtime."""
+        for name in self:
+            self[name]
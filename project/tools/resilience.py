@@ -0,0 +1,387 @@
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from project.core import observability
+from project.core.deadline import time_left
+
+# Setup logger
+resilience_logger = logging.getLogger("Resilience")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Per-host breakers are kept for at most this many hosts (least recently used are dropped)
+MAX_BREAKERS = 1024
+HEDGE_MAX_THREADS = 32
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"Circuit for {key} is open; next probe in {retry_in:.1f}s.")
+        self.key = key
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures, so callers fail fast instead of
+    waiting on a dependency that is down. After reset_timeout one probe call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, key: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.times_opened = 0
+        self.rejections = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejections += 1
+        observability.inc(observability.BREAKER_REJECTIONS, breaker=self.key)
+        return False
+
+    def check(self):
+        """Raises CircuitOpenError unless a call may go ahead."""
+        if not self.allow():
+            raise CircuitOpenError(self.key, max(0.0, self.opened_at + self.reset_timeout - time.monotonic()))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def release_probe(self):
+        """Ends a call that neither succeeded nor failed (e.g. it was never sent)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            log = resilience_logger.warning if state == OPEN else resilience_logger.info
+            log("Circuit for %s: %s -> %s.", self.key, self.state, state)
+        self.state = state
+        observability.set_gauge(observability.BREAKER_STATE, _STATE_VALUES[state], breaker=self.key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejections": self.rejections,
+            }
+
+
+_breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(key: str, **settings) -> CircuitBreaker:
+    """The process-wide breaker for a provider or host key, created with settings on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key, **settings)
+            if len(_breakers) > MAX_BREAKERS:
+                # Drop the least recently used breaker that is not currently tripped
+                for old_key, old in _breakers.items():
+                    if old.state == CLOSED and old is not breaker:
+                        del _breakers[old_key]
+                        break
+        else:
+            _breakers.move_to_end(key)
+        return breaker
+
+
+def breaker_stats(only_tripped: bool = False) -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    stats = {breaker.key: breaker.stats() for breaker in breakers}
+    if only_tripped:
+        stats = {key: value for key, value in stats.items() if value["state"] != CLOSED or value["times_opened"]}
+    return stats
+
+
+class LatencyTracker:
+    """Recent call latencies, for percentile-based hedge delays."""
+
+    def __init__(self, window: int = 200):
+        self._samples: "deque[float]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+# One per hedge pool thread; an attempt only goes to the pool if it can start right away
+_hedge_slots = threading.BoundedSemaphore(HEDGE_MAX_THREADS)
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_THREADS, thread_name_prefix="hedge")
+    return _hedge_executor
+
+
+def _start_attempt(send: Callable[[], Any]) -> Optional[Tuple[Future, threading.Event]]:
+    """
+    Runs send() on the hedge pool, in a copy of the caller's context, if a pool thread is
+    free; returns its Future and an Event set once it has started, or None if all are busy.
+    """
+    if not _hedge_slots.acquire(blocking=False):
+        return None
+    started = threading.Event()
+
+    def attempt():
+        started.set()
+        try:
+            return send()
+        finally:
+            _hedge_slots.release()
+
+    try:
+        # A copy per attempt: one Context cannot be entered by two threads at once
+        return _get_hedge_executor().submit(contextvars.copy_context().run, attempt), started
+    except BaseException:
+        _hedge_slots.release()
+        raise
+
+
+def _close_quietly(future: Future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class Resilience:
+    """
+    Resilience policy for one tool's HTTP calls:
+    - circuit breakers per key (a provider name or a host), failing fast while open;
+    - for idempotent requests, up to `retries` extra attempts on connection errors,
+      timeouts, 429 and 5xx, after a jittered exponential backoff;
+    - with hedge=True, a second identical request once the first has taken longer than
+      the hedge_percentile latency of recent calls; the first response wins and the
+      other is closed when it arrives. Hedges are limited to hedge_budget of all calls
+      and only use idle threads of the shared hedge pool: when it is busy, requests are
+      sent on the caller's thread and not hedged, so a saturated pool never queues (and
+      then duplicates) requests;
+    - a short connect timeout (see timeout()), so a dead host fails in seconds;
+    - no retry once the session deadline (project.core.deadline) is closer than the backoff.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        retries: int = 1,
+        backoff: float = 0.2,
+        max_backoff: float = 2.0,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_min_delay: float = 0.05,
+        hedge_budget: float = 0.05,
+        connect_timeout: float = 3.0,
+        breaker: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget = hedge_budget
+        self.connect_timeout = connect_timeout
+        self.breaker_settings = breaker or {}
+        self.latency = LatencyTracker()
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retried = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+
+    def timeout(self, read_timeout: float) -> Tuple[float, float]:
+        """(connect, read) timeout for requests."""
+        return (min(self.connect_timeout, read_timeout), read_timeout)
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        return get_breaker(key, **self.breaker_settings)
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        delay = self.latency.percentile(self.hedge_percentile, self.hedge_min_samples)
+        return max(self.hedge_min_delay, delay) if delay is not None else None
+
+    def _count(self, attribute: str):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def _take_hedge(self) -> bool:
+        """Claims a hedge from the budget (hedge_budget of all calls so far)."""
+        with self._lock:
+            if self.hedges_fired >= self.hedge_budget * self.calls:
+                self.hedges_skipped += 1
+                return False
+            self.hedges_fired += 1
+            return True
+
+    def _send_hedged(self, send: Callable[[], Any], delay: float) -> Any:
+        started = _start_attempt(send)
+        if started is None:
+            # Every hedge thread is busy: queueing behind them would only add latency
+            self._count("hedges_skipped")
+            return send()
+        primary, primary_started = started
+        # The hedge delay counts from when the primary is actually sending
+        primary_started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge():
+            return primary.result()
+
+        started = _start_attempt(send)
+        if started is None:
+            with self._lock:
+                self.hedges_fired -= 1
+                self.hedges_skipped += 1
+            return primary.result()
+        hedge, _ = started
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+            if winner is not None:
+                won_by_hedge = winner is hedge
+                if won_by_hedge:
+                    self._count("hedges_won")
+                observability.inc(observability.HEDGES, tool=self.name, winner="hedge" if won_by_hedge else "primary")
+                for other in (primary, hedge):
+                    if other is not winner:
+                        other.add_done_callback(_close_quietly)
+                return winner.result()
+        # Both attempts failed: surface the primary's error
+        observability.inc(observability.HEDGES, tool=self.name, winner="none")
+        return primary.result()
+
+    def _send_once(self, send: Callable[[], Any]) -> Any:
+        start = time.monotonic()
+        delay = self.hedge_delay()
+        response = send() if delay is None else self._send_hedged(send, delay)
+        self.latency.record(time.monotonic() - start)
+        return response
+
+    def call(self, send: Callable[[], Any], breaker_key: str, idempotent: bool = True) -> Any:
+        """
+        Runs send() (which returns a requests Response) under the policy. Raises
+        CircuitOpenError without calling send while the breaker is open. A final 429/5xx
+        response is returned to the caller as is; its breaker failure is already counted.
+        """
+        import requests
+
+        breaker = self.breaker(breaker_key)
+        breaker.check()
+        self._count("calls")
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            last_attempt = attempt + 1 == attempts
+            try:
+                response = self._send_once(send) if idempotent else send()
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                if last_attempt or not self._retry(breaker, attempt):
+                    raise
+                continue
+            except BaseException:
+                # Not a dependency failure (e.g. refused by the rate limiter)
+                breaker.release_probe()
+                raise
+
+            status = response.status_code
+            if status >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if (status == 429 or status >= 500) and not last_attempt and self._retry(breaker, attempt, response):
+                continue
+            return response
+
+    def _retry(self, breaker: CircuitBreaker, attempt: int, response: Any = None) -> bool:
+        """
+        Backs off before the next attempt; False if the session deadline leaves no time for
+        one or the breaker no longer allows it.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        left = time_left()
+        if left is not None and left <= delay:
+            return False
+        if not breaker.allow():
+            return False
+        if response is not None:
+            response.close()
+        self._count("retried")
+        observability.inc(observability.RETRIES, tool=self.name)
+        # Full jitter spreads retries from concurrent callers
+        time.sleep(random.uniform(0, delay))
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        hedge_delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retried,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+                "hedges_skipped": self.hedges_skipped,
+                "hedge_win_rate": round(self.hedges_won / self.hedges_fired, 4) if self.hedges_fired else 0.0,
+                "hedge_delay_seconds": round(hedge_delay, 4) if hedge_delay is not None else None,
+            }
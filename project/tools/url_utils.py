@@ -0,0 +1,42 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only carry tracking information and never change page content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref_src"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL so that trivially different spellings of the same page map to one key:
+    adds a missing scheme, lowercases scheme and host, drops default ports, fragments and
+    tracking parameters (utm_*, fbclid, ...), and sorts the remaining query parameters.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        # IPv6 literal; urlsplit strips the brackets
+        host = f"[{host}]"
+
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+def url_key(url: str) -> str:
+    """canonicalize_url(url), or the stripped URL itself when it cannot be parsed."""
+    try:
+        return canonicalize_url(url)
+    except ValueError:
+        return url.strip()